@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Check CLI startup against import budgets using `python -X importtime`.
+
+Every Makefile target starts at least one of these scripts, so each case has
+modules it must not import (deterministic, e.g. no PyYAML for --help) and a
+budget for the total import time. Budgets are sized for a Pi 4; use --scale
+on faster or slower hosts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Set
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def log_info(message: str) -> None:
+    print(f"[startup] {message}")
+
+
+def log_warn(message: str) -> None:
+    print(f"[startup][warn] {message}", file=sys.stderr)
+
+
+@dataclass
+class Case:
+    name: str
+    args: Sequence[str]
+    forbidden: Set[str]
+    budget_ms: float
+
+
+def first_domain() -> str:
+    return sorted(p.parent.name for p in (ROOT / "domains").glob("*/templates") if p.is_dir())[0]
+
+
+def cases() -> List[Case]:
+    return [
+        Case("render_config --help", ["common/render_config.py", "--help"], {"yaml", "jinja2"}, 150),
+        Case("render_config --dry-run", ["common/render_config.py", "--domain", first_domain(), "--dry-run"], {"jinja2"}, 250),
+        Case("deploy --help", ["common/deploy.py", "--help"], {"yaml", "jinja2"}, 150),
+        Case("metadata --help", ["common/metadata.py", "--help"], {"yaml"}, 150),
+    ]
+
+
+def import_profile(args: Sequence[str]) -> Dict[str, int]:
+    """Top-level imports mapped to cumulative microseconds, as reported by -X importtime."""
+    env = dict(os.environ, VAULT_SKIP_DECRYPT="1")
+    env.pop("PIFORGE_TRACE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env, text=True, capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited {result.returncode}:\n{result.stderr[-2000:]}")
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|", 2)
+        modules[name[1:].rstrip()] = int(cumulative)  # keep the nesting indent
+    return modules
+
+
+def imported(modules: Dict[str, int]) -> Set[str]:
+    return {name.strip().split(".")[0] for name in modules}
+
+
+def top_level_ms(modules: Dict[str, int]) -> float:
+    return sum(us for name, us in modules.items() if not name.startswith(" ")) / 1000
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check CLI import time budgets")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (e.g. 0.3 on a laptop)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is compared")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to show for cases over budget")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(list(argv if argv is not None else sys.argv[1:]))
+    failures = 0
+    for case in cases():
+        runs = [import_profile(case.args) for _ in range(max(1, args.repeat))]
+        total = statistics.median(top_level_ms(run) for run in runs)
+        budget = case.budget_ms * args.scale
+        leaked = sorted(case.forbidden & imported(runs[0]))
+        status = "ok"
+        if leaked:
+            status = "FAIL"
+            log_warn(f"{case.name}: imports {', '.join(leaked)} (must be deferred)")
+        if total > budget:
+            status = "FAIL"
+            slowest = sorted(((us, n.strip()) for n, us in runs[0].items() if not n.startswith(" ")), reverse=True)
+            log_warn(f"{case.name}: {total:.1f} ms of imports exceeds {budget:.0f} ms budget")
+            for us, name in slowest[: args.top]:
+                print(f"    {us / 1000:8.1f} ms  {name}")
+        log_info(f"{case.name:<26} {total:7.1f} ms / {budget:5.0f} ms  {status}")
+        failures += status != "ok"
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
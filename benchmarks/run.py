@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Time the config pipeline against a synthetic registry and compare with a baseline.
+
+Each benchmark runs `--repeat` times; the median is compared with the saved
+baseline and anything slower than `--threshold` (and by more than the noise
+floor) is reported as a regression. Baselines are per host, since a laptop and
+a Pi are not comparable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from synthetic import DASHBOARD_DOMAIN, SCALES, Scale, build_tree, domain_name
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_DIR = BENCH_DIR / "baselines"
+DEFAULT_THRESHOLD = 1.3
+NOISE_FLOOR = 0.005  # seconds; smaller regressions are timer noise
+
+
+def log_info(message: str) -> None:
+    print(f"[bench] {message}")
+
+
+def log_warn(message: str) -> None:
+    print(f"[bench][warn] {message}", file=sys.stderr)
+
+
+@dataclass
+class Result:
+    name: str
+    samples: List[float] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def best(self) -> float:
+        return min(self.samples)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"median": round(self.median, 6), "min": round(self.best, 6), "runs": len(self.samples)}
+
+
+def measure(name: str, func: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> Result:
+    result = Result(name)
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # the CLIs log every file they touch
+            func()
+        result.samples.append(time.perf_counter() - started)
+    return result
+
+
+def run_cli(tree: Path, *args: str, expect: tuple = (0,)) -> Callable[[], object]:
+    def call() -> None:
+        result = subprocess.run([sys.executable, *args], cwd=tree, text=True, capture_output=True)
+        if result.returncode not in expect:
+            raise RuntimeError(f"{' '.join(args)} exited {result.returncode}:\n{result.stdout}{result.stderr}")
+
+    return call
+
+
+# ---------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------
+def run_benchmarks(tree: Path, scale: Scale, repeat: int) -> Dict[str, Result]:
+    env = dict(os.environ, VAULT_SKIP_DECRYPT="1")
+    os.environ.update(env)
+    sys.path.insert(0, str(tree / "common"))
+    import github_runners  # noqa: E402  (imported from the synthetic tree)
+    import render_checks  # noqa: E402
+    import render_config as rc  # noqa: E402
+
+    results: Dict[str, Result] = {}
+
+    def add(result: Result) -> None:
+        results[result.name] = result
+        log_info(f"{result.name:<28} median {result.median * 1000:9.1f} ms   min {result.best * 1000:9.1f} ms")
+
+    # cold start: full interpreter + imports, as every Makefile target pays it
+    add(measure("cold_start.render_help", run_cli(tree, "common/render_config.py", "--help"), repeat))
+    add(measure("cold_start.metadata_diff", run_cli(tree, "common/metadata.py", "diff"), repeat))
+
+    # env resolution
+    layers: Dict[str, str] = {}
+    add(measure("env.collect_layers", lambda: layers.update(rc.collect_env_layers(tree, "dev")), repeat))
+    add(measure("env.resolve_variables", lambda: rc.resolve_variables(layers), repeat))
+
+    # templates: one large dashboard domain and the whole service fleet
+    obs = tree / "domains" / DASHBOARD_DOMAIN / "templates"
+    context = rc.build_context(tree, DASHBOARD_DOMAIN, "dev")
+    add(measure("templates.compile_dashboards", lambda: rc.compile_templates(obs), repeat))
+    templates = rc.compile_templates(obs)
+    outputs: Dict[Path, str] = {}
+    add(measure("templates.render_dashboards", lambda: outputs.update(rc.render_outputs(obs, context, templates)), repeat))
+    add(
+        measure(
+            "validate.dashboards_cold",
+            lambda: render_checks.validate_outputs(outputs, render_checks.ValidationCache()),
+            repeat,
+        )
+    )
+    warm = render_checks.ValidationCache()
+    render_checks.validate_outputs(outputs, warm)
+    add(measure("validate.dashboards_cached", lambda: render_checks.validate_outputs(outputs, warm), repeat))
+
+    service_domains = [domain_name(i) for i in range(scale.domains)]
+
+    def render_fleet() -> None:
+        env_vars = rc.load_env_layers(tree, "dev")
+        for domain in service_domains:
+            src = tree / "domains" / domain / "templates"
+            ctx: Dict[str, object] = dict(env_vars)
+            ctx.update(rc.domain_context(tree, domain, "dev"))
+            rc.render_outputs(src, ctx)
+
+    add(measure("render.all_services", render_fleet, repeat))
+    add(
+        measure(
+            "render.matrix_dev_prod",
+            run_cli(tree, "common/render_config.py", "--matrix", "envs=dev,prod", "domains=all", "--skip-validation"),
+            repeat,
+        )
+    )
+
+    runners = github_runners.configured_runners()
+    add(measure("runners.render_fleet", lambda: github_runners.render_fleet(runners, "dev", validate=False), repeat))
+
+    # metadata: generate writes the cache, commit makes diff compare real files
+    add(measure("metadata.generate", run_cli(tree, "common/metadata.py", "generate"), repeat))
+    run_cli(tree, "common/metadata.py", "commit")()
+    add(measure("metadata.diff", run_cli(tree, "common/metadata.py", "diff"), repeat))
+
+    # port/image checks (check_ports shells out to yq, as validate.sh does)
+    check_ports = run_cli(tree, "common/lib/check_ports.py")
+    try:
+        check_ports()
+    except RuntimeError as exc:
+        detail = str(exc).splitlines()[1:2] or [str(exc)]
+        log_warn(f"skipping checks.ports (needs mikefarah yq): {detail[0]}")
+    else:
+        add(measure("checks.ports", check_ports, repeat))
+    add(measure("checks.images", run_cli(tree, "common/lib/check_images.py"), repeat))
+    return results
+
+
+# ---------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------
+def baseline_path(scale_name: str) -> Path:
+    return BASELINE_DIR / f"{socket.gethostname()}-{scale_name}.json"
+
+
+def report(results: Dict[str, Result], scale_name: str, scale: Scale) -> Dict[str, object]:
+    return {
+        "host": socket.gethostname(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "scale": scale_name,
+        "parameters": scale.as_dict(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": {name: result.as_dict() for name, result in results.items()},
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[str]:
+    regressions = []
+    if baseline.get("parameters") != current.get("parameters"):
+        log_warn("Baseline was recorded with different scale parameters; comparison is indicative only")
+    old = baseline.get("results") or {}
+    for name, entry in (current.get("results") or {}).items():  # type: ignore[union-attr]
+        if name not in old:
+            continue
+        before, after = old[name]["median"], entry["median"]
+        if after > before * threshold and after - before > NOISE_FLOOR:
+            regressions.append(f"{name}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms ({after / before:.2f}x)")
+    return regressions
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the config pipeline on a synthetic registry")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="pi", help="Synthetic registry size")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--tree", type=Path, help="Build the synthetic tree here and keep it")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON (default: baselines/<host>-<scale>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Regression ratio")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(list(argv if argv is not None else sys.argv[1:]))
+    scale = SCALES[args.scale]
+    with tempfile.TemporaryDirectory(prefix="piforge-bench-") as tmp:
+        tree = args.tree or Path(tmp) / "tree"
+        started = time.perf_counter()
+        build_tree(tree, scale)
+        log_info(f"Synthetic registry ({args.scale}: {scale.as_dict()}) built in {time.perf_counter() - started:.2f}s")
+        results = run_benchmarks(tree, scale, args.repeat)
+
+    current = report(results, args.scale, scale)
+    if args.json:
+        args.json.write_text(json.dumps(current, indent=2) + "\n")
+
+    path = args.baseline or baseline_path(args.scale)
+    if args.save_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, indent=2) + "\n")
+        log_info(f"Saved baseline {path}")
+        return 0
+    if not path.exists():
+        log_info(f"No baseline at {path}; run with --save-baseline to record one")
+        return 0
+    regressions = compare(current, json.loads(path.read_text()), args.threshold)
+    if regressions:
+        log_warn(f"{len(regressions)} regression(s) against {path}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    log_info(f"No regressions against {path} (threshold {args.threshold}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
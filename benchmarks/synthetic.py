@@ -0,0 +1,225 @@
+"""Generate a synthetic Pi Forge tree for benchmarking the config pipeline.
+
+The tree mirrors the real layout (config-registry/, domains/, common/) so the
+real CLIs can run inside it unmodified: the common/ scripts are copied in and
+resolve ROOT relative to themselves.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import yaml  # type: ignore[import]
+
+REPO = Path(__file__).resolve().parents[1]
+RUNNER_DOMAIN = "github-actions-runner"
+DASHBOARD_DOMAIN = "observability"
+
+
+@dataclass
+class Scale:
+    domains: int = 200
+    env_keys: int = 2000
+    chain_depth: int = 8
+    panels: int = 300
+    dashboards: int = 4
+    rule_groups: int = 40
+    runners: int = 50
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+SCALES = {
+    "small": Scale(domains=20, env_keys=200, chain_depth=4, panels=40, dashboards=2, rule_groups=5, runners=5),
+    "pi": Scale(),
+    "large": Scale(domains=600, env_keys=8000, chain_depth=12, panels=800, dashboards=8, rule_groups=120, runners=200),
+}
+
+
+def domain_name(index: int) -> str:
+    return f"svc{index:04d}"
+
+
+def write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def registry(scale: Scale) -> Dict[str, object]:
+    domains: List[Dict[str, object]] = []
+    ports: Dict[str, Dict[str, int]] = {}
+    for index in range(scale.domains):
+        name = domain_name(index)
+        requires = [domain_name(index - step) for step in (1, 7) if index - step >= 0]
+        domains.append(
+            {
+                "name": name,
+                "description": f"Synthetic service {index}",
+                "placement": "local",
+                "standalone": not requires,
+                "requires": requires,
+                "exposes_to": [DASHBOARD_DOMAIN],
+                "consumes": requires[:1],
+                "networks": [f"{name}-network"],
+            }
+        )
+        ports[name] = {"http": 20000 + index * 2, "metrics": 20001 + index * 2}
+    for name in (DASHBOARD_DOMAIN, RUNNER_DOMAIN):
+        domains.append({"name": name, "placement": "local", "standalone": True, "requires": [], "networks": []})
+    ports[DASHBOARD_DOMAIN] = {"grafana": 3000, "prometheus": 9090}
+    return {"domains": {"domains": domains}, "ports": ports}
+
+
+def base_env(scale: Scale) -> str:
+    """Env keys arranged in ${VAR} chains of chain_depth links."""
+    lines = ["# synthetic base.env", "TZ=UTC", "DOMAIN=bench.example"]
+    for index in range(scale.domains):
+        lines.append(f"SVC{index:04d}_IMAGE=registry.bench.example/svc{index:04d}:1.{index % 10}.0")
+    chains = max(1, scale.env_keys // scale.chain_depth)
+    for chain in range(chains):
+        lines.append(f"CHAIN{chain}_0=/srv/bench/{chain}")
+        for link in range(1, scale.chain_depth):
+            lines.append(f"CHAIN{chain}_{link}=${{CHAIN{chain}_{link - 1}}}/level{link}")
+    lines.extend(
+        [
+            "GRAFANA_IMAGE=grafana/grafana:10.4.7",
+            "GITHUB_ACTIONS_RUNNER_IMAGE=myoung34/github-runner:2.317.0",
+            "GITHUB_ACTIONS_RUNNER_NAME=default",
+            "GITHUB_ACTIONS_RUNNER_REPO_URL=",
+            "GITHUB_ACTIONS_RUNNER_TOKEN=",
+            "GITHUB_ACTIONS_RUNNER_LABELS=self-hosted",
+            "GITHUB_ACTIONS_RUNNER_DOCKER_ENABLED=false",
+        ]
+    )
+    return "\n".join(lines) + "\n"
+
+
+def service_template(index: int, scale: Scale) -> str:
+    name = domain_name(index)
+    upper = name.upper()
+    chain = index % max(1, scale.env_keys // scale.chain_depth)
+    return f"""services:
+  {name}:
+    image: {{{{ {upper}_IMAGE }}}}
+    container_name: {name}
+    restart: unless-stopped
+    environment:
+      TZ: {{{{ TZ }}}}
+      DATA_DIR: {{{{ CHAIN{chain}_{scale.chain_depth - 1} }}}}
+      PUBLIC_URL: https://{name}.{{{{ DOMAIN }}}}
+{{% for dep in domain.requires %}}
+      DEPENDS_ON_{{{{ dep | upper }}}}: "true"
+{{% endfor %}}
+    ports:
+      - "{{{{ PORT_{upper}_HTTP }}}}:8080"
+      - "{{{{ PORT_{upper}_METRICS }}}}:9100"
+    networks:
+      - {name}-network
+
+networks:
+  {name}-network:
+    driver: bridge
+"""
+
+
+def dashboard(index: int, scale: Scale) -> str:
+    panels = []
+    for panel in range(scale.panels):
+        service = domain_name(panel % scale.domains)
+        panels.append(
+            {
+                "id": panel + 1,
+                "title": f"{service} panel {panel}",
+                "type": "timeseries",
+                "gridPos": {"h": 8, "w": 12, "x": (panel % 2) * 12, "y": (panel // 2) * 8},
+                "datasource": {"type": "prometheus", "uid": "prometheus"},
+                "targets": [
+                    {
+                        "datasource": {"type": "prometheus", "uid": "prometheus"},
+                        "expr": f'rate(http_requests_total{{job="{service}",env="{{{{ ENV }}}}"}}[5m])',
+                        "refId": "A",
+                    }
+                ],
+            }
+        )
+    body = json.dumps(
+        {"uid": f"bench-{index}", "title": f"Bench {index} ({{{{ DOMAIN }}}})", "panels": panels}, indent=2
+    )
+    return body + "\n"
+
+
+def rules(scale: Scale) -> str:
+    groups = []
+    for group in range(scale.rule_groups):
+        service = domain_name(group % scale.domains)
+        groups.append(
+            {
+                "name": f"{service}-rules",
+                "interval": "1m",
+                "rules": [
+                    {"record": f"{service}:requests:rate5m", "expr": f'sum(rate(http_requests_total{{job="{service}"}}[5m]))'},
+                    {
+                        "alert": f"{service.capitalize()}Down",
+                        "expr": f'up{{job="{service}"}} == 0',
+                        "for": "5m",
+                        "labels": {"severity": "critical"},
+                        "annotations": {"summary": f"{service} is down"},
+                    },
+                ],
+            }
+        )
+    return yaml.safe_dump({"groups": groups}, sort_keys=False)
+
+
+def build_tree(dest: Path, scale: Scale) -> Path:
+    """Create the synthetic tree under dest (replacing it) and return dest."""
+    if dest.exists():
+        shutil.rmtree(dest)
+    common = dest / "common"
+    (common / "lib").mkdir(parents=True)
+    for script in (REPO / "common").glob("*.py"):
+        shutil.copy2(script, common / script.name)
+    for script in (REPO / "common" / "lib").glob("*.py"):
+        shutil.copy2(script, common / "lib" / script.name)
+
+    env_dir = dest / "config-registry" / "env"
+    data = registry(scale)
+    write(env_dir / "domains.yml", yaml.safe_dump(data["domains"], sort_keys=False))
+    write(env_dir / "ports.yml", yaml.safe_dump(data["ports"], sort_keys=False))
+    write(env_dir / "base.env", base_env(scale))
+    write(env_dir / "overrides" / "dev.env", "LOG_LEVEL=debug\nCHAIN0_0=/srv/dev\n")
+    write(env_dir / "overrides" / "prod.env", "LOG_LEVEL=info\nCHAIN0_0=/srv/prod\n")
+    (dest / "config-registry" / "state").mkdir(parents=True)
+
+    for index in range(scale.domains):
+        write(dest / "domains" / domain_name(index) / "templates" / "compose.yml.tmpl", service_template(index, scale))
+
+    obs = dest / "domains" / DASHBOARD_DOMAIN / "templates"
+    write(
+        obs / "grafana-datasource.yml.tmpl",
+        "apiVersion: 1\ndatasources:\n  - name: Prometheus\n    uid: prometheus\n    type: prometheus\n"
+        "    url: http://prometheus:{{ PORT_OBSERVABILITY_PROMETHEUS }}\n",
+    )
+    write(obs / "prometheus-alerts.yml.tmpl", rules(scale))
+    for index in range(scale.dashboards):
+        write(obs / "dashboards" / f"bench-{index}.json.tmpl", dashboard(index, scale))
+
+    shutil.copytree(REPO / "domains" / RUNNER_DOMAIN / "templates", dest / "domains" / RUNNER_DOMAIN / "templates")
+    runners = env_dir / "runners"
+    runners.mkdir(parents=True)
+    for index in range(scale.runners):
+        name = f"bench{index:03d}"
+        write(
+            runners / f"{RUNNER_DOMAIN}-{name}.env",
+            f"GITHUB_ACTIONS_RUNNER_NAME={name}\n"
+            f"GITHUB_ACTIONS_RUNNER_REPO_URL=https://github.com/bench/repo{index}\n"
+            f"GITHUB_ACTIONS_RUNNER_TOKEN=token-{index}\n"
+            "GITHUB_ACTIONS_RUNNER_LABELS=self-hosted,Linux,ARM64\n"
+            "GITHUB_ACTIONS_RUNNER_DOCKER_ENABLED=true\n",
+        )
+    return dest
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""Restic backup orchestrator driven by config-registry/env/backup.yml.
+
+Database dumps are streamed from `pg_dump` straight into `restic backup --stdin`
+(no temporary .sql files), and independent path groups are backed up
+concurrently under a bounded worker pool. Each phase is timed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import yaml  # type: ignore[import]
+except ImportError:  # pragma: no cover - dependency hint
+    print("[backup] PyYAML not installed. Install with 'pip install -r requirements/render.txt'", file=sys.stderr)
+    raise
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CONFIG = ROOT / "config-registry" / "env" / "backup.yml"
+DEFAULT_REPOSITORY = "/srv/backups/local"
+DEFAULT_PASSWORD_FILE = ROOT / "config-registry" / "env" / "restic.password"
+SECRETS_VAULT = ROOT / "config-registry" / "env" / "secrets.env.vault"
+DEFAULT_RETENTION = {"daily": 7, "weekly": 4, "monthly": 6}
+DEFAULT_WORKERS = 2
+SUDO_ENV = (
+    "RESTIC_REPOSITORY",
+    "RESTIC_PASSWORD_FILE",
+    "BACKUP_MODE",
+    "BACKUP_PRUNE",
+    "BACKUP_CONFIG",
+    "BACKUP_HOST",
+    "PG_DUMP_TIMEOUT",
+    "POSTGRES_SUPERUSER",
+    "POSTGRES_SUPERUSER_PASSWORD",
+)
+
+_LOG_LOCK = threading.Lock()
+
+
+def _log(level: str, message: str) -> None:
+    stamp = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with _LOG_LOCK:
+        stream = sys.stderr if level != "INFO" else sys.stdout
+        print(f"{stamp} [{level}] {message}", file=stream, flush=True)
+
+
+def log_info(message: str) -> None:
+    _log("INFO", message)
+
+
+def log_warn(message: str) -> None:
+    _log("WARN", message)
+
+
+def log_error(message: str) -> None:
+    _log("ERR ", message)
+
+
+class BackupError(Exception):
+    """Raised when a backup task fails."""
+
+
+# ---------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------
+@dataclass
+class Database:
+    name: str
+    container: str = "forgejo-postgres"
+    database: str = ""
+    format: str = "custom"
+    command: Optional[List[str]] = None  # explicit dump command (tests, fixtures)
+    restore_command: Optional[List[str]] = None  # explicit restore command, reads the dump on stdin
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.dump" if self.format == "custom" else f"{self.name}.sql"
+
+
+@dataclass
+class Profile:
+    name: str
+    groups: Dict[str, List[str]]
+    databases: List[Database]
+    workers: int = DEFAULT_WORKERS
+    retention: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_RETENTION))
+
+
+def load_profile(path: Path, name: str, for_restore: bool = False) -> Profile:
+    """Read a backup.yml profile. The vault is always in the `config` group of a
+    restore plan; backups only add it when the file exists locally."""
+    data = yaml.safe_load(path.read_text()) if path.exists() else {}
+    profiles = (data or {}).get("backups") or {}
+    if name not in profiles:
+        raise BackupError(f"Backup profile '{name}' not defined in {path}")
+    entry = profiles[name] or {}
+
+    groups: Dict[str, List[str]] = {}
+    for group, paths in (entry.get("groups") or {}).items():
+        groups[str(group)] = [str(p) for p in paths or []]
+    if entry.get("include"):
+        # flat include list (pre-groups format): one group, backed up as a single snapshot
+        groups.setdefault("files", []).extend(str(p) for p in entry["include"])
+    if for_restore or SECRETS_VAULT.exists():
+        groups.setdefault("config", []).append(str(SECRETS_VAULT))
+
+    databases = []
+    for db in entry.get("databases") or []:
+        if isinstance(db, str):
+            db = {"database": db}
+        database = str(db.get("database") or db.get("name"))
+        command = db.get("command")
+        restore_command = db.get("restore_command")
+        databases.append(
+            Database(
+                name=str(db.get("name") or database),
+                container=str(db.get("container", "forgejo-postgres")),
+                database=database,
+                format=str(db.get("format", "custom")),
+                command=shlex.split(command) if isinstance(command, str) else command,
+                restore_command=shlex.split(restore_command) if isinstance(restore_command, str) else restore_command,
+            )
+        )
+
+    retention = dict(DEFAULT_RETENTION)
+    retention.update({k: int(v) for k, v in (entry.get("retention") or {}).items()})
+    return Profile(
+        name=name,
+        groups=groups,
+        databases=databases,
+        workers=max(1, int(entry.get("workers", DEFAULT_WORKERS))),
+        retention=retention,
+    )
+
+
+# ---------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------
+class Timings:
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.monotonic() - started
+
+    def task(self, name: str, seconds: float, ok: bool, snapshot: Optional[str] = None) -> None:
+        with self._lock:
+            self.tasks[name] = {"seconds": round(seconds, 3), "ok": ok, "snapshot": snapshot}
+
+    def summary(self) -> None:
+        for name, seconds in self.phases.items():
+            log_info(f"[Timing] {name:<12} {seconds:8.1f}s")
+        for name, info in sorted(self.tasks.items()):
+            state = "ok" if info["ok"] else "FAILED"
+            log_info(f"[Timing]   {name:<24} {info['seconds']:8.1f}s {state}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"phases": {k: round(v, 3) for k, v in self.phases.items()}, "tasks": self.tasks}
+
+
+# ---------------------------------------------------------------------
+# Restic
+# ---------------------------------------------------------------------
+class Restic:
+    def __init__(self, binary: str, repository: str, password_file: str, host: str, tags: Sequence[str]) -> None:
+        self.binary = binary
+        self.host = host
+        self.tags = list(tags)
+        self.env = dict(os.environ, RESTIC_REPOSITORY=repository, RESTIC_PASSWORD_FILE=password_file)
+
+    def command(self, *args: str) -> List[str]:
+        return [self.binary, *args]
+
+    def run(self, *args: str, check: bool = True, **kwargs: Any) -> subprocess.CompletedProcess:
+        return subprocess.run(self.command(*args), env=self.env, check=check, text=True, **kwargs)
+
+    def ensure_repository(self) -> None:
+        # `cat config` only reads the repository config file, unlike `snapshots`
+        probe = self.run("cat", "config", check=False, capture_output=True)
+        if probe.returncode == 0:
+            return
+        log_info(f"[Init] Initializing restic repository at {self.env['RESTIC_REPOSITORY']}")
+        self.run("init", capture_output=True)
+
+    def backup_args(self, group: str) -> List[str]:
+        args = ["backup", "--json", "--host", self.host, "--tag", f"group:{group}"]
+        for tag in self.tags:
+            args += ["--tag", tag]
+        return args
+
+    def forget(self, snapshot: str) -> None:
+        self.run("forget", snapshot, check=False, capture_output=True)
+
+    def prune(self, retention: Dict[str, int]) -> None:
+        # restic's default grouping; the date and mode tags must not split the
+        # retention policy into one group per day
+        args = ["forget", "--prune", "--group-by", "host,paths"]
+        for period, count in retention.items():
+            args += [f"--keep-{period}", str(count)]
+        self.run(*args)
+
+
+def snapshot_id(output: str) -> Optional[str]:
+    """Pull the snapshot id out of `restic backup --json` output."""
+    for line in reversed(output.splitlines()):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(message, dict) and message.get("message_type") == "summary":
+            return message.get("snapshot_id")
+    return None
+
+
+# ---------------------------------------------------------------------
+# Tasks
+# ---------------------------------------------------------------------
+def backup_paths(restic: Restic, group: str, paths: Sequence[str], timings: Timings) -> str:
+    existing = [p for p in paths if Path(p).exists()]
+    for missing in sorted(set(paths) - set(existing)):
+        log_warn(f"[Backup] {group}: {missing} does not exist; skipping")
+    if not existing:
+        raise BackupError(f"{group}: no paths to back up")
+    log_info(f"[Backup] {group}: {' '.join(existing)}")
+    started = time.monotonic()
+    result = restic.run(*restic.backup_args(group), *existing, check=False, capture_output=True)
+    snapshot = snapshot_id(result.stdout)
+    timings.task(group, time.monotonic() - started, result.returncode == 0, snapshot)
+    if result.returncode != 0:
+        raise BackupError(f"{group}: restic backup failed ({result.returncode}): {result.stderr.strip()}")
+    log_info(f"[Backup] {group}: snapshot {snapshot or '?'}")
+    return snapshot or ""
+
+
+def postgres_exec(db: Database, stdin: bool = False) -> Tuple[List[str], str]:
+    """`docker exec` prefix and user for psql tools in the container, mirroring its auth setup."""
+    pgpass = subprocess.run(
+        ["docker", "exec", "-u", "postgres", db.container, "test", "-f", "/var/lib/postgresql/.pgpass"],
+        check=False,
+        capture_output=True,
+    )
+    user = os.environ.get("POSTGRES_SUPERUSER") or container_env(db.container, "POSTGRES_USER") or "postgres"
+    if pgpass.returncode == 0:
+        exec_cmd = ["docker", "exec"] + (["-i"] if stdin else []) + ["-u", "postgres"]
+    else:
+        log_warn(f"[DB] .pgpass not found inside {db.container}; falling back to container credentials")
+        password = os.environ.get("POSTGRES_SUPERUSER_PASSWORD") or container_env(db.container, "POSTGRES_PASSWORD")
+        exec_cmd = ["docker", "exec", "-i"] + (["-e", f"PGPASSWORD={password}"] if password else [])
+    return exec_cmd + [db.container], user
+
+
+def postgres_dump_command(db: Database) -> List[str]:
+    """Build the `docker exec ... pg_dump` command."""
+    if db.command:
+        return list(db.command)
+    exec_cmd, user = postgres_exec(db)
+    dump = ["pg_dump", "-U", user, "--no-password"]
+    if db.format == "custom":
+        dump += ["-Fc", "-Z", "6"]
+    return exec_cmd + dump + [db.database]
+
+
+def container_env(container: str, key: str) -> str:
+    result = subprocess.run(
+        ["docker", "exec", container, "printenv", key], check=False, text=True, capture_output=True
+    )
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def container_running(container: str) -> bool:
+    result = subprocess.run(
+        ["docker", "inspect", "-f", "{{.State.Running}}", container], check=False, text=True, capture_output=True
+    )
+    return result.stdout.strip() == "true"
+
+
+def stream_dump(restic: Restic, db: Database, timeout: float, timings: Timings) -> str:
+    """Pipe pg_dump into `restic backup --stdin`; the snapshot is forgotten if the dump fails."""
+    if db.command is None and not container_running(db.container):
+        log_warn(f"[Dump] {db.container} container not running; skipping {db.name}")
+        timings.task(f"db:{db.name}", 0.0, True)
+        return ""
+    dump_cmd = postgres_dump_command(db)
+    source = db.container if db.command is None else dump_cmd[0]
+    log_info(f"[Dump] {db.name} from {source} → restic (format: {db.format}, timeout: {timeout:.0f}s)")
+    started = time.monotonic()
+    # pg_dump's stderr goes to a file: nothing reads a pipe while restic runs
+    dump_errfile = tempfile.TemporaryFile()
+    dump = subprocess.Popen(dump_cmd, stdout=subprocess.PIPE, stderr=dump_errfile)
+    backup = subprocess.Popen(
+        restic.command(*restic.backup_args(f"db:{db.name}"), "--stdin", "--stdin-filename", db.filename),
+        stdin=dump.stdout,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=restic.env,
+        text=True,
+    )
+    assert dump.stdout is not None
+    dump.stdout.close()  # restic owns the read end; pg_dump gets SIGPIPE if restic dies
+    try:
+        backup_out, backup_err = backup.communicate(timeout=timeout)
+        dump_rc = dump.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        dump.kill()
+        backup.kill()
+        backup.communicate()
+        dump.wait()
+        dump_errfile.close()
+        timings.task(f"db:{db.name}", time.monotonic() - started, False)
+        raise BackupError(f"{db.name}: dump timed out after {timeout:.0f}s")
+    with dump_errfile:
+        dump_errfile.seek(0)
+        dump_err = dump_errfile.read().decode(errors="replace")
+    snapshot = snapshot_id(backup_out)
+    ok = dump_rc == 0 and backup.returncode == 0
+    timings.task(f"db:{db.name}", time.monotonic() - started, ok, snapshot)
+    if dump_rc != 0:
+        if snapshot:
+            restic.forget(snapshot)  # never keep a truncated dump
+        raise BackupError(f"{db.name}: pg_dump failed ({dump_rc}): {dump_err.strip()}")
+    if backup.returncode != 0:
+        raise BackupError(f"{db.name}: restic backup failed ({backup.returncode}): {backup_err.strip()}")
+    log_info(f"[Dump] {db.name}: snapshot {snapshot or '?'}")
+    return snapshot or ""
+
+
+# ---------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------
+def run_backup(profile: Profile, restic: Restic, args: argparse.Namespace) -> int:
+    timings = Timings()
+    failures: List[str] = []
+    workers = args.workers or profile.workers
+
+    with timings.phase("init"):
+        restic.ensure_repository()
+
+    with timings.phase("backup"):
+        log_info(
+            f"[Backup] Profile '{profile.name}': {len(profile.databases)} database(s), "
+            f"{len(profile.groups)} path group(s), {workers} worker(s)"
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for db in profile.databases:
+                futures[f"db:{db.name}"] = pool.submit(stream_dump, restic, db, args.dump_timeout, timings)
+            for group, paths in profile.groups.items():
+                futures[group] = pool.submit(backup_paths, restic, group, paths, timings)
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except (BackupError, OSError) as exc:
+                    log_error(f"[Backup] {exc}")
+                    failures.append(name)
+
+    if failures:
+        log_error(f"Backup failed for: {', '.join(failures)}; skipping prune")
+    elif args.prune:
+        with timings.phase("prune"):
+            log_info("[Cleanup] Pruning old backups")
+            restic.prune(profile.retention)
+    else:
+        log_info("[Cleanup] Skipping prune run (BACKUP_PRUNE=0)")
+
+    timings.summary()
+    if args.timings_json:
+        args.timings_json.write_text(json.dumps(timings.as_dict(), indent=2) + "\n")
+    if failures:
+        return 1
+    log_info("[Done] Backup complete.")
+    return 0
+
+
+def reexec_with_sudo(argv: Sequence[str], script: Optional[Path] = None) -> None:
+    preserve = ",".join(key for key in SUDO_ENV if key in os.environ)
+    command = ["sudo"]
+    if preserve:
+        command.append(f"--preserve-env={preserve}")
+    command += [sys.executable, str(script or Path(__file__).resolve()), *argv]
+    os.execvp("sudo", command)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    mode = os.environ.get("BACKUP_MODE") or "manual"
+    parser = argparse.ArgumentParser(description="Streaming restic backup orchestrator")
+    parser.add_argument("--config", type=Path, default=Path(os.environ.get("BACKUP_CONFIG", DEFAULT_CONFIG)))
+    parser.add_argument("--profile", default="cloud" if mode == "cloud" else "full", help="Profile in backup.yml")
+    parser.add_argument("--mode", default=mode, help="Tag recorded on every snapshot (BACKUP_MODE)")
+    parser.add_argument("--repo", default=os.environ.get("RESTIC_REPOSITORY", DEFAULT_REPOSITORY))
+    parser.add_argument(
+        "--password-file", default=os.environ.get("RESTIC_PASSWORD_FILE", str(DEFAULT_PASSWORD_FILE))
+    )
+    parser.add_argument("--host", default=os.environ.get("BACKUP_HOST") or socket.gethostname())
+    parser.add_argument("--restic", default="restic", help="restic binary")
+    parser.add_argument("--workers", type=int, help="Concurrent backup tasks (overrides the profile)")
+    parser.add_argument(
+        "--dump-timeout", type=float, default=float(os.environ.get("PG_DUMP_TIMEOUT", "300")), help="Seconds"
+    )
+    parser.add_argument("--prune", action="store_true", default=os.environ.get("BACKUP_PRUNE") == "1")
+    parser.add_argument("--timings-json", type=Path, help="Write per-phase timings to this file")
+    parser.add_argument("--no-sudo", action="store_true", help="Do not re-exec under sudo when not root")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = list(argv if argv is not None else sys.argv[1:])
+    args = parse_args(argv)
+    if os.geteuid() != 0 and not args.no_sudo:
+        reexec_with_sudo(argv)
+
+    if not shutil.which(args.restic):
+        log_error(f"Missing dependency: {args.restic}")
+        return 1
+    password_file = Path(args.password_file)
+    if not password_file.is_absolute():
+        password_file = ROOT / password_file
+    if not password_file.exists():
+        log_error(f"Restic password file not found: {password_file}")
+        return 1
+
+    try:
+        profile = load_profile(args.config, args.profile)
+    except BackupError as exc:
+        log_error(str(exc))
+        return 1
+    tags = [dt.date.today().strftime("%Y%m%d"), args.mode]
+    restic = Restic(args.restic, args.repo, str(password_file), args.host, tags)
+    log_info(f"[Backup] Starting restic backup to {args.repo}")
+    try:
+        return run_backup(profile, restic, args)
+    except subprocess.CalledProcessError as exc:
+        log_error(f"{' '.join(exc.cmd)} failed with exit code {exc.returncode}")
+        return exc.returncode or 1
+    except KeyboardInterrupt:
+        log_error("Backup interrupted")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
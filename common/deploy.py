@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Run `docker compose up` for rendered domains and record deploy fingerprints.
+
+With --if-changed, a domain whose fingerprint (rendered files, out-of-tree
+bind mounts and local image IDs) matches the last successful deploy is reported
+and skipped without invoking compose.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from render_config import DEPLOY_STATE, deploy_fingerprint, load_deploy_state, save_deploy_state
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def log_info(message: str) -> None:
+    print(f"[deploy] {message}")
+
+
+def log_warn(message: str) -> None:
+    print(f"[deploy][warn] {message}", file=sys.stderr)
+
+
+def compose_up(domain: str, pull: bool, force_recreate: bool) -> bool:
+    command = ["docker", "compose", "-f", f"generated/{domain}/compose.yml", "up", "-d"]
+    if pull:
+        command += ["--pull", "always"]
+    if force_recreate:
+        command.append("--force-recreate")
+    return subprocess.run(command, cwd=ROOT).returncode == 0
+
+
+def deploy(domains: List[str], args: argparse.Namespace) -> int:
+    state = load_deploy_state(args.state)
+    deployed: List[str] = []
+    skipped: List[str] = []
+    failed: List[str] = []
+
+    for domain in domains:
+        if not (ROOT / "generated" / domain / "compose.yml").exists():
+            log_warn(f"compose.yml not found for {domain}")
+            failed.append(domain)
+            continue
+        previous = state.get(domain) or {}
+        if args.if_changed and not args.force_recreate:
+            current = deploy_fingerprint(ROOT, domain)
+            if previous.get("fingerprint") == current["fingerprint"]:
+                log_info(f"{domain}: unchanged since {previous.get('deployed_at', '?')}; skipping")
+                skipped.append(domain)
+                continue
+            if previous:
+                reasons = [k for k in ("files", "images") if previous.get(k) != current[k]]
+                log_info(f"{domain}: {' and '.join(reasons) or 'fingerprint'} changed since last deploy")
+
+        started = time.monotonic()
+        log_info(f"Deploying {domain}")
+        if not compose_up(domain, pull=args.pull, force_recreate=args.force_recreate):
+            log_warn(f"Failed to deploy {domain}")
+            state.pop(domain, None)
+            failed.append(domain)
+            continue
+        # recompute after the pull so the recorded image IDs are the ones now running
+        record: Dict[str, object] = dict(deploy_fingerprint(ROOT, domain))
+        record["deployed_at"] = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        state[domain] = record
+        save_deploy_state(state, args.state)
+        deployed.append(domain)
+        log_info(f"{domain}: deployed in {time.monotonic() - started:.1f}s")
+
+    if failed:
+        save_deploy_state(state, args.state)
+    if len(domains) > 1 or skipped:
+        log_info(
+            f"{len(deployed)} deployed, {len(skipped)} unchanged, {len(failed)} failed"
+            + (f" (unchanged: {', '.join(skipped)})" if skipped else "")
+        )
+    return 1 if failed else 0
+
+
+def forget(domains: List[str], args: argparse.Namespace) -> int:
+    state = load_deploy_state(args.state)
+    removed = [domain for domain in domains if state.pop(domain, None) is not None]
+    if removed:
+        save_deploy_state(state, args.state)
+    return 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Deploy rendered domains with docker compose")
+    parser.add_argument("domains", nargs="+", help="Domains under generated/")
+    parser.add_argument(
+        "--if-changed",
+        action="store_true",
+        help="Skip domains whose fingerprint matches the last successful deploy",
+    )
+    parser.add_argument("--force-recreate", action="store_true", help="Pass --force-recreate to compose")
+    parser.add_argument("--no-pull", dest="pull", action="store_false", help="Do not pass --pull always")
+    parser.add_argument(
+        "--forget",
+        action="store_true",
+        help="Drop recorded fingerprints (the next --if-changed deploy always runs)",
+    )
+    parser.add_argument("--state", type=Path, default=DEPLOY_STATE, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(list(argv if argv is not None else sys.argv[1:]))
+    domains = list(dict.fromkeys(args.domains))
+    if args.forget:
+        return forget(domains, args)
+    return deploy(domains, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
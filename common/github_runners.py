@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Manage a fleet of GitHub Actions runner instances.
+
+Every runner is described by config-registry/env/runners/github-actions-runner-<name>.env
+and rendered from the github-actions-runner domain templates into
+generated/github-actions-runner-<name>/. The shared render context (env layers,
+vault, ports) and the compiled templates are loaded once per invocation, so
+rendering N runners costs one vault decrypt and one Jinja compile. Compose
+up/down runs in parallel batches, and `list` reads a cached status index that
+is refreshed with a single `docker ps` call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from render_checks import ValidationCache, ValidationError, validate_outputs
+from render_config import (
+    VALIDATION_CACHE,
+    collect_env_layers,
+    compile_templates,
+    domain_context,
+    load_env_layers,
+    parse_env_file,
+    render_outputs,
+    write_outputs,
+)
+from suppression import TEXTFILE_DIR, SuppressionStore, export_metrics
+
+ROOT = Path(__file__).resolve().parents[1]
+DOMAIN = "github-actions-runner"
+PREFIX = f"{DOMAIN}-"
+RUNNERS_DIR = ROOT / "config-registry" / "env" / "runners"
+STATUS_INDEX = ROOT / "config-registry" / "state" / "runner-status.json"
+STATUS_TTL = 30  # seconds before `list` refreshes the index from docker
+DEFAULT_PARALLEL = 4
+DEFAULT_LABELS = "self-hosted,Linux,ARM64"
+
+
+def log_info(message: str) -> None:
+    print(f"[runners] {message}")
+
+
+def log_warn(message: str) -> None:
+    print(f"[runners][warn] {message}", file=sys.stderr)
+
+
+@dataclass(frozen=True)
+class Runner:
+    name: str
+
+    @property
+    def container(self) -> str:
+        return f"{PREFIX}{self.name}"
+
+    @property
+    def env_file(self) -> Path:
+        return RUNNERS_DIR / f"{self.container}.env"
+
+    @property
+    def output_dir(self) -> Path:
+        return ROOT / "generated" / self.container
+
+    @property
+    def compose_file(self) -> Path:
+        return self.output_dir / "compose.yml"
+
+    @property
+    def data_dir(self) -> Path:
+        return Path("/srv") / self.container
+
+
+def configured_runners() -> List[Runner]:
+    if not RUNNERS_DIR.exists():
+        return []
+    return [Runner(p.stem[len(PREFIX):]) for p in sorted(RUNNERS_DIR.glob(f"{PREFIX}*.env"))]
+
+
+def select_runners(names: Sequence[str]) -> List[Runner]:
+    """Resolve names to configured runners; no names selects the whole fleet."""
+    if not names:
+        return configured_runners()
+    runners = [Runner(name) for name in dict.fromkeys(names)]
+    missing = [r.name for r in runners if not r.env_file.exists()]
+    if missing:
+        raise FileNotFoundError(f"Runner(s) not found: {', '.join(missing)}. Run 'add' first.")
+    return runners
+
+
+# ---------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------
+def render_fleet(runners: Sequence[Runner], env_name: str, validate: bool = True) -> List[str]:
+    """Render every runner with one shared context; returns names that failed to render or validate.
+
+    Failed runners are not written, so their existing compose.yml is left in place.
+    """
+    src = ROOT / "domains" / DOMAIN / "templates"
+    if not runners:
+        return []
+    layers = collect_env_layers(ROOT, env_name)
+    static = domain_context(ROOT, DOMAIN, env_name)
+    templates = compile_templates(src)
+    cache = ValidationCache(VALIDATION_CACHE)
+    failed: List[str] = []
+
+    started = time.monotonic()
+    for runner in runners:
+        context: Dict[str, object] = {}
+        context.update(load_env_layers(ROOT, env_name, extra_env=runner.env_file, layers=layers))
+        context.update(static)
+        errors: List[str] = []
+        outputs = render_outputs(src, context, templates, errors)
+        if errors:
+            for error in errors:
+                log_warn(f"render failed for {runner.container}/{error}")
+            failed.append(runner.name)
+            continue
+        if validate:
+            try:
+                validate_outputs(outputs, cache)
+            except ValidationError as exc:
+                for error in exc.errors:
+                    log_warn(f"invalid {runner.container}/{error}")
+                failed.append(runner.name)
+                continue
+        write_outputs(ROOT, runner.container, runner.output_dir, outputs)
+    log_info(f"Rendered {len(runners) - len(failed)}/{len(runners)} runner(s) in {time.monotonic() - started:.2f}s")
+    return failed
+
+
+# ---------------------------------------------------------------------
+# Status index
+# ---------------------------------------------------------------------
+class StatusIndex:
+    """Container state for every runner, refreshed with one `docker ps` call."""
+
+    def __init__(self, path: Path = STATUS_INDEX, ttl: float = STATUS_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.updated_at = 0.0
+        self.states: Dict[str, str] = {}
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        if isinstance(data, dict):
+            self.updated_at = float(data.get("updated_at") or 0)
+            self.states = dict(data.get("containers") or {})
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.updated_at < self.ttl
+
+    def refresh(self) -> bool:
+        try:
+            result = subprocess.run(
+                ["docker", "ps", "-a", "--filter", f"name={PREFIX}", "--format", "{{.Names}}\t{{.State}}"],
+                check=True,
+                text=True,
+                capture_output=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log_warn(f"Unable to query docker ({exc}); showing cached status")
+            return False
+        states = {}
+        for line in result.stdout.splitlines():
+            name, _, state = line.partition("\t")
+            if name.startswith(PREFIX):
+                states[name] = state or "unknown"
+        self.states = states
+        self.updated_at = time.time()
+        self.save()
+        return True
+
+    def mark(self, containers: Sequence[str], state: Optional[str]) -> None:
+        """Record the outcome of an up/down without another docker call."""
+        for container in containers:
+            if state is None:
+                self.states.pop(container, None)
+            else:
+                self.states[container] = state
+        self.save()
+
+    def state(self, container: str) -> str:
+        return self.states.get(container, "stopped")
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps({"updated_at": self.updated_at, "containers": self.states}, indent=2) + "\n")
+            tmp.replace(self.path)
+        except OSError as exc:
+            log_warn(f"Unable to write {self.path} ({exc})")
+
+
+# ---------------------------------------------------------------------
+# Compose
+# ---------------------------------------------------------------------
+def compose(runner: Runner, *args: str) -> bool:
+    try:
+        result = subprocess.run(
+            ["docker", "compose", "-f", str(runner.compose_file), *args],
+            cwd=ROOT,
+            text=True,
+            capture_output=True,
+        )
+    except OSError as exc:
+        log_warn(f"{runner.container}: unable to run docker compose ({exc})")
+        return False
+    if result.returncode != 0:
+        log_warn(f"{runner.container}: docker compose {' '.join(args)} failed\n{result.stderr.strip()}")
+        return False
+    return True
+
+
+def run_parallel(runners: Sequence[Runner], action: Callable[[Runner], bool], parallel: int) -> List[Runner]:
+    """Apply action to each runner in batches of `parallel`; returns runners that succeeded."""
+    ok: List[Runner] = []
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        for runner, succeeded in zip(runners, pool.map(action, runners)):
+            if succeeded:
+                ok.append(runner)
+    return ok
+
+
+def update_suppression(containers: Sequence[str], suppress: bool, reason: str = "runner down") -> None:
+    if not containers:
+        return
+    store = SuppressionStore()
+    try:
+        with store.transaction():
+            if suppress:
+                store.suppress(containers, reason, None, time.time())
+            else:
+                store.release(containers)
+        export_metrics(store, TEXTFILE_DIR)
+    except OSError as exc:
+        log_warn(f"Unable to update alert suppression ({exc})")
+
+
+# ---------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------
+def cmd_add(args: argparse.Namespace) -> int:
+    runner = Runner(args.name)
+    if runner.env_file.exists():
+        log_warn(f"Runner '{runner.name}' already exists")
+        return 1
+    RUNNERS_DIR.mkdir(parents=True, exist_ok=True)
+    runner.env_file.write_text(
+        f"# GitHub Actions Runner: {runner.name}\n"
+        f"GITHUB_ACTIONS_RUNNER_NAME={runner.name}\n"
+        f"GITHUB_ACTIONS_RUNNER_REPO_URL={args.repo_url}\n"
+        f"GITHUB_ACTIONS_RUNNER_TOKEN={args.token}\n"
+        f"GITHUB_ACTIONS_RUNNER_LABELS={args.labels}\n"
+        f"GITHUB_ACTIONS_RUNNER_DOCKER_ENABLED={args.docker_enabled}\n"
+    )
+    runner.env_file.chmod(0o600)
+    log_info(f"Created runner configuration: {runner.env_file.relative_to(ROOT)}")
+    print("")
+    print("Next steps:")
+    print(f"  1. Review and edit {runner.env_file.relative_to(ROOT)} if needed")
+    print(f"  2. Run: make render-github-runner NAME={runner.name}")
+    print(f"  3. Run: make deploy-github-runner NAME={runner.name}")
+    return 0
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    runners = configured_runners()
+    index = StatusIndex()
+    if runners and (args.refresh or not index.fresh):
+        index.refresh()
+    rows = []
+    for runner in runners:
+        repo_url = parse_env_file(runner.env_file).get("GITHUB_ACTIONS_RUNNER_REPO_URL") or "not set"
+        rows.append({"name": runner.name, "status": index.state(runner.container), "repo_url": repo_url})
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    if not rows:
+        print("No runners configured")
+        return 0
+    print("Configured runners:")
+    for row in rows:
+        print(f"  {row['name']:<20} {row['status']:<10} {row['repo_url']}")
+    return 0
+
+
+def cmd_render(args: argparse.Namespace) -> int:
+    runners = select_runners(args.names)
+    if not runners:
+        log_info("No runners configured")
+        return 0
+    return 1 if render_fleet(runners, args.env, validate=not args.skip_validation) else 0
+
+
+def cmd_deploy(args: argparse.Namespace) -> int:
+    runners = select_runners(args.names)
+    if not runners:
+        log_info("No runners configured")
+        return 0
+    failed = set(render_fleet(runners, args.env, validate=not args.skip_validation))
+    targets = [r for r in runners if r.name not in failed]
+    up_args = ["up", "-d"] + (["--pull", "always"] if args.pull else [])
+    log_info(f"Deploying {len(targets)} runner(s), {args.parallel} at a time")
+    deployed = run_parallel(targets, lambda r: compose(r, *up_args), args.parallel)
+    containers = [r.container for r in deployed]
+    StatusIndex().mark(containers, "running")
+    update_suppression(containers, suppress=False)
+    for runner in deployed:
+        log_info(f"Deployed {runner.container}")
+    return 0 if len(deployed) == len(runners) else 1
+
+
+def cmd_down(args: argparse.Namespace) -> int:
+    runners = select_runners(args.names) if args.names else configured_runners()
+    missing = [r for r in runners if not r.compose_file.exists()]
+    if args.names and missing:
+        log_warn(f"Not deployed (compose file not found): {', '.join(r.name for r in missing)}")
+    targets = [r for r in runners if r.compose_file.exists()]
+    log_info(f"Bringing down {len(targets)} runner(s), {args.parallel} at a time")
+    stopped = run_parallel(targets, lambda r: compose(r, "down"), args.parallel)
+    containers = [r.container for r in stopped]
+    StatusIndex().mark(containers, None)
+    update_suppression(containers, suppress=True)
+    return 0 if len(stopped) == len(targets) and not (args.names and missing) else 1
+
+
+def cmd_destroy(args: argparse.Namespace) -> int:
+    runner = Runner(args.name)
+    if runner.compose_file.exists():
+        log_info("Stopping and removing container...")
+        compose(runner, "down", "-v")
+    if runner.data_dir.is_dir():
+        log_info(f"Removing data directory: {runner.data_dir}")
+        reply = "y" if args.yes else input("This will delete all runner data. Continue? [y/N] ")
+        if reply.strip().lower() == "y":
+            shutil.rmtree(runner.data_dir)
+        else:
+            log_info("Skipped data directory removal")
+    if runner.env_file.exists():
+        log_info(f"Removing configuration: {runner.env_file.relative_to(ROOT)}")
+        runner.env_file.unlink()
+    if runner.output_dir.is_dir():
+        log_info(f"Removing generated files: {runner.output_dir.relative_to(ROOT)}")
+        shutil.rmtree(runner.output_dir)
+    StatusIndex().mark([runner.container], None)
+    update_suppression([runner.container], suppress=False)
+    log_info(f"Runner '{runner.name}' destroyed")
+    return 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Manage GitHub Actions runner instances")
+    parser.add_argument("--env", default="dev", help="Environment override to load")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="Add a new runner instance")
+    add.add_argument("name")
+    add.add_argument("--repo-url", default="", help="Repository URL (e.g., https://github.com/owner/repo)")
+    add.add_argument("--token", required=True, help="Registration token from GitHub")
+    add.add_argument("--labels", default=DEFAULT_LABELS, help="Comma-separated labels")
+    add.add_argument("--docker-enabled", default="true", choices=("true", "false"))
+    add.set_defaults(func=cmd_add)
+
+    listing = sub.add_parser("list", help="List runner instances and their status")
+    listing.add_argument("--refresh", action="store_true", help="Query docker even if the index is fresh")
+    listing.add_argument("--json", action="store_true", help="Emit JSON")
+    listing.set_defaults(func=cmd_list)
+
+    for name, func, help_text in (
+        ("render", cmd_render, "Render compose files (all runners when no names are given)"),
+        ("deploy", cmd_deploy, "Render and start runners (all runners when no names are given)"),
+        ("down", cmd_down, "Stop runners and suppress their alerts (all runners when no names are given)"),
+    ):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("names", nargs="*")
+        cmd.set_defaults(func=func)
+        if name != "down":
+            cmd.add_argument("--skip-validation", action="store_true", help="Skip rendered output checks")
+        if name != "render":
+            cmd.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL, help="Runners handled at once")
+        if name == "deploy":
+            cmd.add_argument("--no-pull", dest="pull", action="store_false", help="Do not pull images")
+
+    destroy = sub.add_parser("destroy", help="Remove a runner's container, data and configuration")
+    destroy.add_argument("name")
+    destroy.add_argument("--yes", action="store_true", help="Delete the data directory without prompting")
+    destroy.set_defaults(func=cmd_destroy)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(list(argv if argv is not None else sys.argv[1:]))
+    try:
+        return args.func(args)
+    except FileNotFoundError as exc:
+        log_warn(str(exc))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,7 +14,7 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Tuple
 
-import yaml
+from tracing import add_arguments as add_profile_arguments, configure as configure_tracing, span
 
 ROOT = Path(__file__).resolve().parents[1]
 STATE_DIR = ROOT / "config-registry" / "state"
@@ -36,7 +36,53 @@ def log_error(message: str) -> None:
     print(f"[metadata][err] {message}")
 
 
+def _yaml() -> Any:
+    import yaml  # deferred so --help and no-drift diffs of unchanged files skip it
+
+    return yaml
+
+
+def _git_dir() -> Path | None:
+    dot_git = ROOT / ".git"
+    if dot_git.is_file():  # worktree or submodule: "gitdir: <path>"
+        content = dot_git.read_text().strip()
+        if not content.startswith("gitdir:"):
+            return None
+        dot_git = (ROOT / content.split(":", 1)[1].strip()).resolve()
+    return dot_git if dot_git.is_dir() else None
+
+
+def read_git_head() -> str | None:
+    """Resolve HEAD from .git/HEAD, loose refs and packed-refs without forking git."""
+    git_dir = _git_dir()
+    if git_dir is None:
+        return None
+    common_file = git_dir / "commondir"  # linked worktrees keep refs in the main repo
+    common = (git_dir / common_file.read_text().strip()).resolve() if common_file.exists() else git_dir
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref:"):
+        return head or None
+    ref = head.split(":", 1)[1].strip()
+    for base in (git_dir, common):
+        loose = base / ref
+        if loose.is_file():
+            return loose.read_text().strip() or None
+    packed = common / "packed-refs"
+    if packed.exists():
+        for line in packed.read_text().splitlines():
+            sha, _, name = line.partition(" ")
+            if name == ref and not line.startswith(("#", "^")):
+                return sha
+    return None  # unborn branch
+
+
 def current_git_commit() -> str:
+    try:
+        commit = read_git_head()
+    except (OSError, UnicodeDecodeError):
+        commit = None
+    if commit:
+        return commit[:7]
     try:
         return (
             subprocess.check_output(
@@ -73,19 +119,21 @@ def template_hash(domain: str) -> str | None:
     base = ROOT / "domains" / domain / "templates"
     if not base.exists():
         return None
-    paths = sorted(base.rglob("*.tmpl"))
-    if not paths:
-        return None
-    h = hashlib.sha256()
-    for path in paths:
-        h.update(path.read_bytes())
-    return h.hexdigest()
+    with span("template_hash", domain=domain):
+        paths = sorted(base.rglob("*.tmpl"))
+        if not paths:
+            return None
+        h = hashlib.sha256()
+        for path in paths:
+            h.update(path.read_bytes())
+        return h.hexdigest()
 
 
 def load_yaml(path: Path) -> Any:
     if not path.exists():
         return {}
-    return yaml.safe_load(path.read_text()) or {}
+    with span("yaml.load", file=path.name):
+        return _yaml().safe_load(path.read_text()) or {}
 
 
 def load_domains() -> List[Dict[str, Any]]:
@@ -174,10 +222,12 @@ def generate_domain_metadata(
 def write_metadata(domain: str, data: Dict[str, Any]) -> bool:
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
     cache_path = CACHE_DIR / f"{domain}.yml"
-    new_content = yaml.safe_dump(data, sort_keys=False)
+    with span("yaml.dump", domain=domain):
+        new_content = _yaml().safe_dump(data, sort_keys=False)
     if cache_path.exists() and cache_path.read_text() == new_content:
         return False
-    cache_path.write_text(new_content)
+    with span("write", file=cache_path.name):
+        cache_path.write_text(new_content)
     log_info(f"Updated {cache_path.relative_to(ROOT)}")
     return True
 
@@ -232,7 +282,8 @@ def cmd_generate(args: argparse.Namespace) -> None:
 def load_metadata(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {}
-    data = yaml.safe_load(path.read_text()) or {}
+    with span("yaml.load", file=path.name):
+        data = _yaml().safe_load(path.read_text()) or {}
     if isinstance(data, dict):
         data = data.copy()
         meta = data.get("_meta")
@@ -243,7 +294,24 @@ def load_metadata(path: Path) -> Dict[str, Any]:
     return data
 
 
+def _without_timestamp(text: str) -> List[str]:
+    """Lines of a metadata file minus `_meta.generated_at`; same-named keys elsewhere are kept."""
+    lines = []
+    in_meta = False
+    for line in text.splitlines():
+        if line and not line[0].isspace():
+            in_meta = line.rstrip() == "_meta:"
+        elif in_meta and line.lstrip().startswith("generated_at:"):
+            continue
+        lines.append(line)
+    return lines
+
+
 def diff_domain(domain: str, canonical: Path, cache: Path) -> Tuple[bool, str]:
+    # both files come from write_metadata, so identical text minus _meta.generated_at means no drift
+    if _without_timestamp(canonical.read_text()) == _without_timestamp(cache.read_text()):
+        return False, ""
+    yaml = _yaml()
     canon_data = load_metadata(canonical)
     cache_data = load_metadata(cache)
     if canon_data == cache_data:
@@ -325,12 +393,14 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     sub.add_parser("diff", help="Show drift between cache and canonical metadata")
     sub.add_parser("commit", help="Copy cache to canonical metadata files")
     sub.add_parser("check", help="Generate then fail if drift detected")
+    add_profile_arguments(parser)
 
     return parser.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv or sys.argv[1:])
+    configure_tracing("metadata", args)
     if args.command == "generate":
         cmd_generate(args)
         return 0
@@ -0,0 +1,290 @@
+"""Post-render structural checks for Prometheus rules and Grafana dashboards.
+
+Rendered outputs are validated in memory before render_config.py writes them,
+so a broken rule file or dashboard never reaches a Prometheus/Grafana reload.
+Successful results are cached by content hash under config-registry/state so
+unchanged artifacts are not re-validated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Set
+
+# Bump when checks change so cached results from older rules are ignored
+CHECKS_VERSION = "1"
+CACHE_LIMIT = 512
+
+_DURATION = re.compile(
+    r"^(([0-9]+)y)?(([0-9]+)w)?(([0-9]+)d)?(([0-9]+)h)?(([0-9]+)m)?(([0-9]+)s)?(([0-9]+)ms)?$"
+)
+YAML_SUFFIXES = {".yml", ".yaml"}
+# datasource references that are not provisioned UIDs
+_BUILTIN_DATASOURCES = {"grafana", "-- Grafana --", "-- Mixed --", "-- Dashboard --"}
+
+
+class ValidationError(Exception):
+    """Raised when one or more rendered artifacts fail validation."""
+
+    def __init__(self, errors: List[str]) -> None:
+        super().__init__(f"{len(errors)} validation error(s)")
+        self.errors = errors
+
+
+def is_duration(value: object) -> bool:
+    if value == 0:
+        return True
+    return isinstance(value, str) and value != "" and bool(_DURATION.match(value))
+
+
+# ---------------------------------------------------------------------
+# Prometheus rules
+# ---------------------------------------------------------------------
+def is_rule_file(data: object) -> bool:
+    return isinstance(data, dict) and isinstance(data.get("groups"), list)
+
+
+def check_rule_file(name: str, data: Dict[str, Any]) -> List[str]:
+    errors: List[str] = []
+    seen_groups: Set[str] = set()
+    for index, group in enumerate(data["groups"]):
+        if not isinstance(group, dict):
+            errors.append(f"{name}: groups[{index}] is not a mapping")
+            continue
+        group_name = group.get("name")
+        label = f"{name}: group '{group_name or index}'"
+        if not group_name:
+            errors.append(f"{name}: groups[{index}] has no name")
+        elif group_name in seen_groups:
+            errors.append(f"{label} is defined more than once")
+        else:
+            seen_groups.add(group_name)
+        if "interval" in group and not is_duration(group["interval"]):
+            errors.append(f"{label} has invalid interval '{group['interval']}'")
+        rules = group.get("rules")
+        if not isinstance(rules, list):
+            errors.append(f"{label} has no rules list")
+            continue
+        for rule_index, rule in enumerate(rules):
+            errors.extend(check_rule(f"{label} rule[{rule_index}]", rule))
+    return errors
+
+
+def check_rule(label: str, rule: object) -> List[str]:
+    if not isinstance(rule, dict):
+        return [f"{label} is not a mapping"]
+    errors: List[str] = []
+    kinds = [key for key in ("alert", "record") if rule.get(key)]
+    if len(kinds) != 1:
+        errors.append(f"{label} must set exactly one of 'alert' or 'record'")
+    else:
+        label = f"{label} ({rule[kinds[0]]})"
+    expr = rule.get("expr")
+    if expr is None or (isinstance(expr, str) and not expr.strip()):
+        errors.append(f"{label} has an empty expr")
+    for key in ("for", "keep_firing_for"):
+        if key in rule:
+            if "record" in kinds:
+                errors.append(f"{label} recording rules do not support '{key}'")
+            elif not is_duration(rule[key]):
+                errors.append(f"{label} has invalid {key}: '{rule[key]}'")
+    for key in ("labels", "annotations"):
+        if key in rule and not isinstance(rule[key], (dict, type(None))):
+            errors.append(f"{label} '{key}' must be a mapping")
+    return errors
+
+
+# ---------------------------------------------------------------------
+# Grafana
+# ---------------------------------------------------------------------
+def datasource_uids(data: object) -> Set[str]:
+    if not isinstance(data, dict) or not isinstance(data.get("datasources"), list):
+        return set()
+    return {str(ds["uid"]) for ds in data["datasources"] if isinstance(ds, dict) and ds.get("uid")}
+
+
+def datasource_names(data: object) -> Set[str]:
+    if not isinstance(data, dict) or not isinstance(data.get("datasources"), list):
+        return set()
+    return {str(ds["name"]) for ds in data["datasources"] if isinstance(ds, dict) and ds.get("name")}
+
+
+def iter_panels(panels: object) -> Iterable[Dict[str, Any]]:
+    if not isinstance(panels, list):
+        return
+    for panel in panels:
+        if isinstance(panel, dict):
+            yield panel
+            yield from iter_panels(panel.get("panels"))
+
+
+def datasource_ref(value: object) -> str | None:
+    if isinstance(value, dict):
+        uid = value.get("uid")
+        return str(uid) if uid is not None else None
+    if isinstance(value, str):
+        return value
+    return None
+
+
+def check_dashboard(
+    name: str, data: Dict[str, Any], known_uids: Set[str], known_names: Set[str] | None = None
+) -> List[str]:
+    """Panel id and datasource checks; plain-string datasources (pre-uid dashboards) may also be names."""
+    known_names = known_names or set()
+    errors: List[str] = []
+    seen_ids: Dict[int, str] = {}
+    for panel in iter_panels(data.get("panels")):
+        title = panel.get("title") or panel.get("type") or "<untitled>"
+        panel_id = panel.get("id")
+        if panel_id is not None:
+            if panel_id in seen_ids:
+                errors.append(f"{name}: panel id {panel_id} used by '{seen_ids[panel_id]}' and '{title}'")
+            else:
+                seen_ids[panel_id] = title
+        if not known_uids:
+            continue
+        refs = [panel.get("datasource")]
+        refs.extend(t.get("datasource") for t in panel.get("targets") or [] if isinstance(t, dict))
+        for ref in refs:
+            uid = datasource_ref(ref)
+            if uid is None or uid.startswith("$") or uid in _BUILTIN_DATASOURCES:
+                continue
+            if uid in known_uids or (isinstance(ref, str) and uid in known_names):
+                continue
+            kind = "uid or name" if isinstance(ref, str) else "uid"
+            errors.append(f"{name}: panel '{title}' references unknown datasource {kind} '{uid}'")
+    return errors
+
+
+# ---------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------
+class ValidationCache:
+    """Content-hash keyed record of artifacts that already passed validation.
+
+    A cache without a path lives in memory only.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.dirty = False
+        try:
+            data = json.loads(path.read_text()) if path is not None else {}
+        except (OSError, ValueError):
+            data = {}
+        if isinstance(data, dict) and data.get("version") == CHECKS_VERSION:
+            self.entries = dict(data.get("validated") or {})
+
+    @staticmethod
+    def key(name: str, content: str, extra: str = "") -> str:
+        h = hashlib.sha256()
+        for part in (CHECKS_VERSION, name, extra, content):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Dict[str, str] | None:
+        return self.entries.get(key)
+
+    def add(self, key: str, **info: str) -> None:
+        self.entries.pop(key, None)
+        self.entries[key] = info
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty or self.path is None:
+            return
+        entries = list(self.entries.items())[-CACHE_LIMIT:]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": CHECKS_VERSION, "validated": dict(entries)}, indent=1))
+        tmp.replace(self.path)
+        self.dirty = False
+
+
+# ---------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------
+def validate_outputs(outputs: Mapping[Path, str], cache: ValidationCache | None = None) -> int:
+    """Validate rendered outputs keyed by path relative to the domain output dir.
+
+    Artifacts whose content hash is already in the cache are skipped without
+    being parsed. Returns the number of artifacts checked (cache misses);
+    raises ValidationError listing every problem found.
+    """
+    import yaml  # type: ignore[import]  # deferred: CLIs that never validate skip the import
+
+    cache = cache if cache is not None else ValidationCache()
+    errors: List[str] = []
+    checked = 0
+
+    yaml_files = sorted(rel for rel in outputs if rel.suffix in YAML_SUFFIXES)
+    json_files = sorted(rel for rel in outputs if rel.suffix == ".json")
+
+    for rel in yaml_files:
+        name, content = rel.as_posix(), outputs[rel]
+        key = ValidationCache.key(name, content)
+        if cache.get(key) is not None:
+            continue
+        checked += 1
+        try:
+            data = yaml.safe_load(content)
+        except yaml.YAMLError as exc:
+            errors.append(f"{name}: invalid YAML ({exc})")
+            continue
+        file_errors = check_rule_file(name, data) if is_rule_file(data) else []
+        if file_errors:
+            errors.extend(file_errors)
+        else:
+            cache.add(key, name=name)
+
+    # dashboards are re-checked whenever a datasource provisioning file changes
+    datasource_files = [rel for rel in yaml_files if "datasources:" in outputs[rel]]
+    uid_context = "".join(outputs[rel] for rel in datasource_files)
+    known_uids: Set[str] | None = None
+    known_names: Set[str] = set()
+    dashboard_uids: Dict[str, str] = {}
+    for rel in json_files:
+        name, content = rel.as_posix(), outputs[rel]
+        key = ValidationCache.key(name, content, uid_context)
+        info = cache.get(key)
+        if info is None:
+            checked += 1
+            try:
+                data = json.loads(content)
+            except ValueError as exc:
+                errors.append(f"{name}: invalid JSON ({exc})")
+                continue
+            if not isinstance(data, dict) or "panels" not in data:
+                cache.add(key, name=name)
+                continue
+            if known_uids is None:
+                known_uids = set()
+                for ds_rel in datasource_files:
+                    try:
+                        provisioned = yaml.safe_load(outputs[ds_rel])
+                        known_uids |= datasource_uids(provisioned)
+                        known_names |= datasource_names(provisioned)
+                    except yaml.YAMLError:
+                        pass  # reported above
+            file_errors = check_dashboard(name, data, known_uids, known_names)
+            if file_errors:
+                errors.extend(file_errors)
+                continue
+            info = {"name": name, "uid": str(data.get("uid") or "")}
+            cache.add(key, **info)
+        uid = info.get("uid")
+        if uid:
+            if uid in dashboard_uids:
+                errors.append(f"{name}: dashboard uid '{uid}' already used by {dashboard_uids[uid]}")
+            dashboard_uids[uid] = name
+
+    cache.save()
+    if errors:
+        raise ValidationError(errors)
+    return checked
@@ -4,29 +4,32 @@
 from __future__ import annotations
 
 import argparse
+import difflib
+import functools
+import hashlib
+import json
 import os
 import re
 import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
-from string import Template
-from typing import Dict, Iterable
+from string import Template as EnvTemplate
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
 
-try:
-    import yaml  # type: ignore[import]
-except ImportError as exc:  # pragma: no cover - dependency hint
-    print("[render] PyYAML not installed. Install with 'pip install -r requirements/render.txt'", file=sys.stderr)
-    raise
-
-try:
-    from jinja2 import Environment, FileSystemLoader, StrictUndefined  # type: ignore[import]
-except ImportError as exc:  # pragma: no cover - dependency hint
-    print("[render] Jinja2 not installed. Install with 'pip install -r requirements/render.txt'", file=sys.stderr)
-    raise
+if TYPE_CHECKING:
+    from jinja2 import Template  # type: ignore[import]
 
+from render_checks import ValidationCache, ValidationError, validate_outputs
+from tracing import add_arguments as add_profile_arguments, configure as configure_tracing, span
 
 ROOT = Path(__file__).resolve().parents[1]
+VALIDATION_CACHE = ROOT / "config-registry" / "state" / "render-cache" / "validation.json"
+DEPLOY_STATE = ROOT / "config-registry" / "state" / "deploy-fingerprints.json"
+REVISION_CACHE = ROOT / "config-registry" / "state" / "render-cache" / "revisions"
+REVISION_CACHE_LIMIT = 64
+MATRIX_DIR = "generated-matrix"  # render-matrix --sink generated, relative to ROOT
 _MASK = re.compile(r"=[^=\n]+")
 
 
@@ -43,6 +46,26 @@ def log_warn(message: str) -> None:
     print(f"[render][warn] {message}")
 
 
+# PyYAML and Jinja2 are imported on first use: --help, --dry-run and the
+# deploy/runner helpers that only need env layers should not pay for them.
+def _yaml() -> Any:
+    try:
+        import yaml  # type: ignore[import]
+    except ImportError:  # pragma: no cover - dependency hint
+        print("[render] PyYAML not installed. Install with 'pip install -r requirements/render.txt'", file=sys.stderr)
+        raise
+    return yaml
+
+
+def _jinja() -> Any:
+    try:
+        import jinja2  # type: ignore[import]
+    except ImportError:  # pragma: no cover - dependency hint
+        print("[render] Jinja2 not installed. Install with 'pip install -r requirements/render.txt'", file=sys.stderr)
+        raise
+    return jinja2
+
+
 def parse_env_content(content: str) -> Dict[str, str]:
     data: Dict[str, str] = {}
     for raw_line in content.splitlines():
@@ -66,7 +89,9 @@ def parse_env_file(path: Path) -> Dict[str, str]:
     return parse_env_content(path.read_text())
 
 
+@functools.lru_cache(maxsize=None)
 def decrypt_secrets(root: Path) -> Dict[str, str]:
+    # cached: the vault is env-independent, so a matrix render decrypts it once
     vault_file = root / "config-registry" / "env" / "secrets.env.vault"
     if not vault_file.exists():
         return {}
@@ -81,18 +106,19 @@ def decrypt_secrets(root: Path) -> Dict[str, str]:
         log_warn(".vault_pass not found; skipping secrets.env.vault (see docs/operations/secrets.md)")
         return {}
     try:
-        result = subprocess.run(
-            [
-                "ansible-vault",
-                "view",
-                str(vault_file),
-                "--vault-password-file",
-                str(pass_file),
-            ],
-            check=True,
-            text=True,
-            capture_output=True,
-        )
+        with span("decrypt_secrets"):
+            result = subprocess.run(
+                [
+                    "ansible-vault",
+                    "view",
+                    str(vault_file),
+                    "--vault-password-file",
+                    str(pass_file),
+                ],
+                check=True,
+                text=True,
+                capture_output=True,
+            )
     except subprocess.CalledProcessError as exc:
         log_warn(f"Unable to decrypt secrets.env.vault ({exc}); see docs/operations/secrets.md")
         return {}
@@ -100,6 +126,11 @@ def decrypt_secrets(root: Path) -> Dict[str, str]:
 
 
 def resolve_variables(env: Dict[str, str]) -> Dict[str, str]:
+    with span("resolve_variables", keys=len(env)):
+        return _resolve_variables(env)
+
+
+def _resolve_variables(env: Dict[str, str]) -> Dict[str, str]:
     resolved = dict(env)
     # iteratively resolve ${VAR} placeholders
     for _ in range(len(resolved) or 1):
@@ -107,7 +138,7 @@ def resolve_variables(env: Dict[str, str]) -> Dict[str, str]:
         for key, value in list(resolved.items()):
             if not isinstance(value, str):
                 continue
-            new_value = Template(value).safe_substitute(resolved)
+            new_value = EnvTemplate(value).safe_substitute(resolved)
             if new_value != value:
                 resolved[key] = new_value
                 changed = True
@@ -127,32 +158,50 @@ def resolve_variables(env: Dict[str, str]) -> Dict[str, str]:
     return resolved
 
 
-def load_env_layers(root: Path, env_name: str, extra_env: Path | None = None) -> Dict[str, str]:
+def collect_env_layers(root: Path, env_name: str, host_root: Path | None = None) -> Dict[str, str]:
+    """Merge base, override, host and vault layers without resolving ${VAR} references.
+
+    host_root supplies the untracked .env and the vault when root is a git export.
+    """
+    host_root = host_root or root
     base = parse_env_file(root / "config-registry" / "env" / "base.env")
-    host = parse_env_file(root / ".env")
+    host = parse_env_file(host_root / ".env")
     overrides = parse_env_file(root / "config-registry" / "env" / "overrides" / f"{env_name}.env")
-    secrets = decrypt_secrets(root)
-    extra = parse_env_file(extra_env) if extra_env else {}
+    secrets = decrypt_secrets(host_root)
     combined: Dict[str, str] = {}
     combined.update(base)
     combined.update(overrides)
     combined.update(host)
     combined.update(secrets)
-    combined.update(extra)  # Extra env loaded last to override everything
-    return resolve_variables(combined)
+    return combined
+
+
+def load_env_layers(
+    root: Path,
+    env_name: str,
+    extra_env: Path | None = None,
+    layers: Dict[str, str] | None = None,
+) -> Dict[str, str]:
+    with span("load_env_layers", env=env_name):
+        combined = dict(layers if layers is not None else collect_env_layers(root, env_name))
+        if extra_env:
+            combined.update(parse_env_file(extra_env))  # Extra env loaded last to override everything
+        return resolve_variables(combined)
 
 
 def load_ports(root: Path) -> Dict[str, Dict[str, int]]:
     ports_file = root / "config-registry" / "env" / "ports.yml"
     if not ports_file.exists():
         return {}
-    data = yaml.safe_load(ports_file.read_text())
+    with span("yaml.load", file="ports.yml"):
+        data = _yaml().safe_load(ports_file.read_text())
     return data or {}
 
 
 def load_domains(root: Path) -> Iterable[Dict[str, object]]:
     domains_file = root / "config-registry" / "env" / "domains.yml"
-    data = yaml.safe_load(domains_file.read_text()) if domains_file.exists() else {}
+    with span("yaml.load", file="domains.yml"):
+        data = _yaml().safe_load(domains_file.read_text()) if domains_file.exists() else {}
     return data.get("domains", []) if isinstance(data, dict) else []
 
 
@@ -179,68 +228,111 @@ def derive_output_path(path: Path, root: Path) -> Path:
     return candidate
 
 
-def render(domain: str, env_name: str, dry_run: bool = False, extra_env: Path | None = None) -> None:
-    root = ROOT
-    src = root / "domains" / domain / "templates"
-    if not src.exists():
-        log_warn(f"Template directory {src} not found; nothing to render")
-        return
+def domain_context(
+    root: Path,
+    domain: str,
+    env_name: str,
+    ports: Dict[str, Dict[str, int]] | None = None,
+    domains_data: List[Dict[str, object]] | None = None,
+) -> Dict[str, object]:
+    """Context keys that do not depend on the env layers (domain entry, ports).
 
-    dst = root / "generated" / domain
-    dst.mkdir(parents=True, exist_ok=True)
-
-    existing_files = {p for p in dst.rglob("*") if p.is_file()}
-    generated_files: set[Path] = set()
-
-    env_vars = load_env_layers(root, env_name, extra_env=extra_env)
-    ports = load_ports(root)
-    domains_data = list(load_domains(root))
+    Pass `ports`/`domains_data` to reuse registry files already loaded by the caller.
+    """
+    ports = ports if ports is not None else load_ports(root)
+    domains_data = domains_data if domains_data is not None else list(load_domains(root))
     domain_entry = next((d for d in domains_data if d.get("name") == domain), {})
 
     context: Dict[str, object] = {}
-    context.update(env_vars)
     context["ENV"] = env_name
     context["DOMAIN"] = domain
     context["domain"] = domain_entry
     context["ports"] = ports
     context.update(build_port_env_vars(ports))
+    return context
 
-    if domain == "registry" and not context.get("REGISTRY_HTTP_SECRET"):
-        log_warn("REGISTRY_HTTP_SECRET is empty; token authentication will fail until it is set")
 
-    log_info(f"Rendering {domain} for environment {env_name}")
+def build_context(
+    root: Path, domain: str, env_name: str, extra_env: Path | None = None
+) -> Dict[str, object]:
+    context: Dict[str, object] = {}
+    context.update(load_env_layers(root, env_name, extra_env=extra_env))
+    context.update(domain_context(root, domain, env_name))
+    return context
 
-    if dry_run:
-        log_info("DRY-RUN: available context keys")
-        for key in sorted(context):
-            print(f"  {key}")
-        return
 
-    jinja_env = Environment(
-        loader=FileSystemLoader(str(src)),
+def compile_templates(src: Path) -> Dict[Path, Template]:
+    """Compile every template under src once; keyed by relative output path."""
+    jinja2 = _jinja()
+    jinja_env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(src)),
         autoescape=False,
-        undefined=StrictUndefined,
+        undefined=jinja2.StrictUndefined,
         trim_blocks=True,
         lstrip_blocks=True,
     )
 
     template_files = sorted({p for suffix in TEMPLATE_SUFFIXES for p in src.rglob(f"*{suffix}")})
-    if not template_files:
-        log_warn(f"No templates matched (*.tmpl) in {src}")
-        return
+    templates: Dict[Path, Template] = {}
+    for path in template_files:
+        name = path.relative_to(src).as_posix()
+        with span("get_template", template=name):
+            templates[derive_output_path(path, src)] = jinja_env.get_template(name)
+    return templates
+
+
+def render_outputs(
+    src: Path,
+    context: Dict[str, object],
+    templates: Dict[Path, Template] | None = None,
+    errors: List[str] | None = None,
+) -> Dict[Path, str]:
+    """Render every template under src; returns output text keyed by relative output path.
+
+    Failing templates are skipped; pass `errors` to collect their messages.
+    """
+    templates = templates if templates is not None else compile_templates(src)
+    outputs: Dict[Path, str] = {}
+    for relative_output, template in templates.items():
+        try:
+            with span("template.render", template=template.name):
+                output_text = template.render(**context)
+        except Exception as exc:  # pragma: no cover - rendering failures
+            log_warn(f"Render failed for {template.name}: {exc}")
+            if errors is not None:
+                errors.append(f"{template.name}: {exc}")
+            continue
+        outputs[relative_output] = output_text
+    return outputs
+
+
+def validate_rendered(domain: str, outputs: Dict[Path, str]) -> None:
+    cache = ValidationCache(VALIDATION_CACHE)
+    try:
+        with span("validate", domain=domain):
+            checked = validate_outputs(outputs, cache)
+    except ValidationError as exc:
+        for error in exc.errors:
+            log_warn(f"invalid {domain}/{error}")
+        raise
+    if checked:
+        log_info(f"Validated {checked} rendered artifact(s) for {domain}")
+
+
+def write_outputs(root: Path, domain: str, dst: Path, outputs: Dict[Path, str]) -> None:
+    with span("write", domain=domain, files=len(outputs)):
+        _write_outputs(root, domain, dst, outputs)
+
+
+def _write_outputs(root: Path, domain: str, dst: Path, outputs: Dict[Path, str]) -> None:
+    dst.mkdir(parents=True, exist_ok=True)
+    existing_files = {p for p in dst.rglob("*") if p.is_file()}
+    generated_files: set[Path] = set()
 
     changed = 0
     removed = 0
     unchanged = 0
-    for template_path in template_files:
-        template_name = template_path.relative_to(src).as_posix()
-        template = jinja_env.get_template(template_name)
-        try:
-            output_text = template.render(**context)
-        except Exception as exc:  # pragma: no cover - rendering failures
-            log_warn(f"Render failed for {template_name}: {exc}")
-            continue
-        relative_output = derive_output_path(template_path, src)
+    for relative_output, output_text in outputs.items():
         out_file = dst / relative_output
         generated_files.add(out_file)
         out_file.parent.mkdir(parents=True, exist_ok=True)
@@ -277,19 +369,439 @@ def render(domain: str, env_name: str, dry_run: bool = False, extra_env: Path |
             log_info(f"{unchanged} files unchanged for {domain}")
 
 
+# ---------------------------------------------------------------------
+# Deploy fingerprints
+# ---------------------------------------------------------------------
+def _hash_path(h: Any, path: Path, label: str) -> None:
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        name = label if file == path else f"{label}/{file.relative_to(path).as_posix()}"
+        h.update(name.encode() + b"\0")
+        try:
+            h.update(file.read_bytes())
+        except OSError:
+            h.update(b"<missing>")
+        h.update(b"\0")
+
+
+def compose_services(compose_file: Path) -> Dict[str, Dict[str, object]]:
+    yaml = _yaml()
+    try:
+        data = yaml.safe_load(compose_file.read_text()) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+    services = data.get("services") if isinstance(data, dict) else None
+    return {str(k): v for k, v in (services or {}).items() if isinstance(v, dict)}
+
+
+def bind_sources(compose_file: Path, dst: Path) -> List[Path]:
+    """Relative bind-mount sources that live outside the generated directory."""
+    sources = set()
+    for service in compose_services(compose_file).values():
+        for volume in service.get("volumes") or []:
+            source = volume.get("source") if isinstance(volume, dict) else str(volume).split(":", 1)[0]
+            if not source or not str(source).startswith("."):
+                continue
+            path = (compose_file.parent / str(source)).resolve()
+            if path.exists() and dst.resolve() not in (path, *path.parents):
+                sources.add(path)
+    return sorted(sources)
+
+
+def image_digests(images: Iterable[str]) -> Dict[str, str]:
+    """Resolve image references to local image IDs with one `docker image inspect` call."""
+    refs = sorted(set(images))
+    if not refs or not shutil.which("docker"):
+        return {ref: "unknown" for ref in refs}
+    result = subprocess.run(["docker", "image", "inspect", *refs], text=True, capture_output=True)
+    try:
+        inspected = json.loads(result.stdout or "[]")
+    except ValueError:
+        inspected = []
+    by_ref: Dict[str, str] = {}
+    for image in inspected:
+        for tag in (image.get("RepoTags") or []) + (image.get("RepoDigests") or []):
+            by_ref[tag] = image.get("Id", "unknown")
+    digests: Dict[str, str] = {}
+    for ref in refs:
+        tagged = ref if "@" in ref or ":" in ref.rsplit("/", 1)[-1] else f"{ref}:latest"
+        digests[ref] = by_ref.get(ref) or by_ref.get(tagged) or "missing"
+    return digests
+
+
+def deploy_fingerprint(root: Path, domain: str) -> Dict[str, object]:
+    """Hash of the rendered outputs, out-of-tree bind mounts and local image IDs."""
+    dst = root / "generated" / domain
+    compose_file = dst / "compose.yml"
+    files = hashlib.sha256()
+    _hash_path(files, dst, domain)
+    for source in bind_sources(compose_file, dst):
+        _hash_path(files, source, source.relative_to(root).as_posix() if root in source.parents else str(source))
+    services = compose_services(compose_file)
+    images = image_digests(str(s["image"]) for s in services.values() if s.get("image"))
+    combined = hashlib.sha256(files.hexdigest().encode())
+    combined.update(json.dumps(images, sort_keys=True).encode())
+    return {"fingerprint": combined.hexdigest(), "files": files.hexdigest(), "images": images}
+
+
+def load_deploy_state(path: Path = DEPLOY_STATE) -> Dict[str, Dict[str, object]]:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_deploy_state(state: Dict[str, Dict[str, object]], path: Path = DEPLOY_STATE) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(dict(sorted(state.items())), indent=2) + "\n")
+    tmp.replace(path)
+
+
+def render(
+    domain: str,
+    env_name: str,
+    dry_run: bool = False,
+    extra_env: Path | None = None,
+    validate: bool = True,
+) -> None:
+    root = ROOT
+    src = root / "domains" / domain / "templates"
+    if not src.exists():
+        log_warn(f"Template directory {src} not found; nothing to render")
+        return
+
+    dst = root / "generated" / domain
+    with span("build_context", domain=domain):
+        context = build_context(root, domain, env_name, extra_env)
+
+    if domain == "registry" and not context.get("REGISTRY_HTTP_SECRET"):
+        log_warn("REGISTRY_HTTP_SECRET is empty; token authentication will fail until it is set")
+
+    log_info(f"Rendering {domain} for environment {env_name}")
+
+    if dry_run:
+        log_info("DRY-RUN: available context keys")
+        for key in sorted(context):
+            print(f"  {key}")
+        return
+
+    outputs = render_outputs(src, context)
+    if not outputs:
+        log_warn(f"No templates matched (*.tmpl) in {src}")
+        return
+
+    # nothing is written when validation fails, so the previous outputs stay in place
+    if validate:
+        validate_rendered(domain, outputs)
+
+    write_outputs(root, domain, dst, outputs)
+
+
+# ---------------------------------------------------------------------
+# Render diff
+# ---------------------------------------------------------------------
+def render_in_memory(domain: str, env_name: str, validate: bool = True) -> Dict[Path, str]:
+    src = ROOT / "domains" / domain / "templates"
+    if not src.exists():
+        raise FileNotFoundError(f"Template directory {src} not found")
+    errors: List[str] = []
+    outputs = render_outputs(src, build_context(ROOT, domain, env_name), errors=errors)
+    if errors:
+        raise ValidationError(errors)
+    if validate:
+        validate_rendered(domain, outputs)
+    return outputs
+
+
+def _git(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", "-C", str(ROOT), *args], check=True, capture_output=True)
+
+
+def _revision_cache_path(commit: str, domain: str, env_name: str) -> Path:
+    # the untracked .env and the vault feed every render, so they are part of the key
+    h = hashlib.sha256()
+    for path in (ROOT / ".env", ROOT / "config-registry" / "env" / "secrets.env.vault"):
+        h.update(path.read_bytes() if path.exists() else b"")
+        h.update(b"\0")
+    return REVISION_CACHE / f"{commit[:12]}-{domain}-{env_name}-{h.hexdigest()[:12]}.json"
+
+
+def render_at_revision(domain: str, env_name: str, revision: str) -> Dict[Path, str]:
+    """Render a domain as of a git revision (templates and tracked config from the revision).
+
+    Results are cached per commit under config-registry/state/render-cache/revisions.
+    """
+    try:
+        commit = _git("rev-parse", "--verify", f"{revision}^{{commit}}").stdout.decode().strip()
+    except subprocess.CalledProcessError as exc:
+        raise ValueError(f"unknown revision '{revision}': {exc.stderr.decode().strip()}") from exc
+    cache_file = _revision_cache_path(commit, domain, env_name)
+    try:
+        cached = json.loads(cache_file.read_text())
+        return {Path(rel): text for rel, text in cached.items()}
+    except (OSError, ValueError):
+        pass
+
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix="render-rev-") as tmp:
+        tree = Path(tmp)
+        paths = [p for p in (f"domains/{domain}", "config-registry/env") if _git("ls-tree", commit, p).stdout]
+        if not paths:
+            return {}
+        archive = _git("archive", "--format=tar", commit, *paths).stdout
+        subprocess.run(["tar", "-x", "-C", str(tree)], input=archive, check=True)
+        src = tree / "domains" / domain / "templates"
+        if not src.exists():
+            return {}
+        context: Dict[str, object] = {}
+        context.update(resolve_variables(collect_env_layers(tree, env_name, host_root=ROOT)))
+        context.update(domain_context(tree, domain, env_name))
+        outputs = render_outputs(src, context)
+
+    try:
+        REVISION_CACHE.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({rel.as_posix(): text for rel, text in outputs.items()}))
+        for stale in sorted(REVISION_CACHE.glob("*.json"), key=lambda p: p.stat().st_mtime)[:-REVISION_CACHE_LIMIT]:
+            stale.unlink()
+    except OSError as exc:
+        log_warn(f"Unable to cache render of {revision} ({exc})")
+    return outputs
+
+
+def read_outputs(dst: Path) -> Dict[Path, str]:
+    if not dst.is_dir():
+        return {}
+    return {p.relative_to(dst): p.read_text() for p in sorted(dst.rglob("*")) if p.is_file()}
+
+
+def unified_diffs(old: Dict[Path, str], new: Dict[Path, str], old_label: str, new_label: str) -> List[str]:
+    """One unified diff per differing file; missing files diff against /dev/null."""
+    diffs = []
+    for rel in sorted(set(old) | set(new)):
+        before, after = old.get(rel), new.get(rel)
+        if before == after:
+            continue
+        diffs.append(
+            "".join(
+                difflib.unified_diff(
+                    (before or "").splitlines(keepends=True),
+                    (after or "").splitlines(keepends=True),
+                    fromfile=f"{old_label}/{rel.as_posix()}" if before is not None else "/dev/null",
+                    tofile=f"{new_label}/{rel.as_posix()}" if after is not None else "/dev/null",
+                )
+            )
+        )
+    return diffs
+
+
+def render_diff(domain: str, env_name: str, revision: str | None = None, validate: bool = True) -> int:
+    """Print diffs of the in-memory render against generated/ (or a revision); returns files changed."""
+    current = render_in_memory(domain, env_name, validate=validate)
+    if revision:
+        baseline, label = render_at_revision(domain, env_name, revision), f"{revision}/{domain}"
+    else:
+        baseline, label = read_outputs(ROOT / "generated" / domain), f"generated/{domain}"
+    diffs = unified_diffs(baseline, current, label, f"rendered/{domain}")
+    for diff in diffs:
+        sys.stdout.write(diff if diff.endswith("\n") else diff + "\n")
+    if diffs:
+        log_info(f"{domain}: {len(diffs)} file(s) differ from {label}")
+    else:
+        log_info(f"{domain}: no differences from {label}")
+    return len(diffs)
+
+
+# ---------------------------------------------------------------------
+# Render matrix
+# ---------------------------------------------------------------------
+def parse_matrix(tokens: List[str], root: Path) -> Tuple[List[str], List[str]]:
+    """Parse `envs=dev,prod domains=all` into env and domain lists."""
+    spec = {"envs": "dev", "domains": "all"}
+    for token in tokens:
+        key, sep, value = token.partition("=")
+        if not sep or key not in spec:
+            raise ValueError(f"invalid --matrix entry '{token}' (expected envs=<a,b|all> or domains=<a,b|all>)")
+        spec[key] = value
+    overrides = root / "config-registry" / "env" / "overrides"
+    envs = [e for e in spec["envs"].split(",") if e]
+    if envs == ["all"]:
+        envs = sorted(p.stem for p in overrides.glob("*.env"))
+    domains = [d for d in spec["domains"].split(",") if d]
+    if domains == ["all"]:
+        domains = sorted(p.parent.name for p in (root / "domains").glob("*/templates") if p.is_dir())
+    if not envs or not domains:
+        raise ValueError(f"--matrix selects no {'envs' if not envs else 'domains'}")
+    # an unknown env would silently render base.env alone and pass
+    unknown = [e for e in envs if not (overrides / f"{e}.env").is_file()]
+    if unknown:
+        raise FileNotFoundError(f"Unknown env(s) (no overrides/<env>.env): {', '.join(unknown)}")
+    missing = [d for d in domains if not (root / "domains" / d / "templates").is_dir()]
+    if missing:
+        raise FileNotFoundError(f"Template directory not found for: {', '.join(missing)}")
+    return envs, domains
+
+
+def diff_summary(dst: Path, outputs: Dict[Path, str]) -> Dict[str, List[str]]:
+    """Compare rendered outputs with the files currently under dst."""
+    existing = {p.relative_to(dst) for p in dst.rglob("*") if p.is_file()} if dst.is_dir() else set()
+    summary: Dict[str, List[str]] = {"added": [], "changed": [], "removed": [], "unchanged": []}
+    for rel, text in sorted(outputs.items()):
+        if rel not in existing:
+            summary["added"].append(rel.as_posix())
+        elif (dst / rel).read_text() != text:
+            summary["changed"].append(rel.as_posix())
+        else:
+            summary["unchanged"].append(rel.as_posix())
+    summary["removed"] = sorted(rel.as_posix() for rel in existing - set(outputs))
+    return summary
+
+
+def render_matrix(
+    envs: List[str],
+    domains: List[str],
+    sink: str = "memory",
+    validate: bool = True,
+    jobs: int | None = None,
+) -> int:
+    """Render every (env, domain) pair in one process and print a per-env summary.
+
+    Templates are compiled once per domain and env layers are resolved once per
+    env; ports.yml and domains.yml are parsed once. Cells render concurrently.
+    With sink="generated" outputs are written to generated-matrix/<env>/<domain>
+    (kept out of generated/, which holds one directory per domain), otherwise
+    they only exist in memory. Diffs are reported against generated/<domain>.
+    Returns the number of failed cells.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    root = ROOT
+    started = time.monotonic()
+    templates = {domain: compile_templates(root / "domains" / domain / "templates") for domain in domains}
+    env_vars = {env: load_env_layers(root, env) for env in envs}
+    ports = load_ports(root)
+    domains_data = list(load_domains(root))
+
+    def render_cell(cell: Tuple[str, str]) -> Tuple[Dict[Path, str], List[str]]:
+        env, domain = cell
+        with span("render_cell", env=env, domain=domain):
+            return _render_cell(env, domain)
+
+    def _render_cell(env: str, domain: str) -> Tuple[Dict[Path, str], List[str]]:
+        context: Dict[str, object] = {}
+        context.update(env_vars[env])
+        context.update(domain_context(root, domain, env, ports=ports, domains_data=domains_data))
+        errors: List[str] = []
+        outputs = render_outputs(root / "domains" / domain / "templates", context, templates[domain], errors)
+        return outputs, errors
+
+    cells = [(env, domain) for env in envs for domain in domains]
+    with ThreadPoolExecutor(max_workers=jobs or min(len(cells), os.cpu_count() or 1) or 1) as pool:
+        results = dict(zip(cells, pool.map(render_cell, cells)))
+    elapsed = time.monotonic() - started
+    log_info(
+        f"Matrix: {len(envs)} env(s) x {len(domains)} domain(s), "
+        f"{sum(len(t) for t in templates.values())} template(s) compiled once, rendered in {elapsed:.2f}s"
+    )
+
+    cache = ValidationCache(VALIDATION_CACHE)
+    failed = 0
+    for env in envs:
+        totals = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+        touched: List[str] = []
+        env_errors = 0
+        for domain in domains:
+            outputs, errors = results[(env, domain)]
+            if validate and outputs:
+                try:
+                    validate_outputs(outputs, cache)
+                except ValidationError as exc:
+                    errors.extend(exc.errors)
+            for error in errors:
+                log_warn(f"[{env}] invalid {domain}/{error}")
+            if errors:
+                env_errors += len(errors)
+                failed += 1
+            summary = diff_summary(root / "generated" / domain, outputs)
+            for key in totals:
+                totals[key] += len(summary[key])
+            for key in ("added", "changed", "removed"):
+                touched.extend(f"{domain}/{name} ({key})" for name in summary[key])
+            if sink == "generated" and not errors:
+                write_outputs(root, f"{env}/{domain}", root / MATRIX_DIR / env / domain, outputs)
+        log_info(
+            f"{env}: {len(domains)} domain(s), {totals['changed']} changed, {totals['added']} added, "
+            f"{totals['removed']} removed, {totals['unchanged']} unchanged vs generated/; {env_errors} error(s)"
+        )
+        for entry in touched:
+            print(f"  {entry}")
+    return failed
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Render domain templates")
-    parser.add_argument("--domain", required=True, help="Domain name (matches folder under domains/)")
+    parser.add_argument("--domain", help="Domain name (matches folder under domains/)")
     parser.add_argument("--env", default="dev", help="Environment override to load")
     parser.add_argument("--dry-run", action="store_true", help="Print available context keys and exit")
     parser.add_argument("--extra-env", type=Path, help="Additional env file to load (overrides all others)")
+    parser.add_argument(
+        "--skip-validation",
+        action="store_true",
+        help="Write outputs without checking rule files and dashboards",
+    )
+    parser.add_argument(
+        "--matrix",
+        nargs="+",
+        metavar="KEY=VALUES",
+        help="Render several envs/domains in one pass, e.g. --matrix envs=dev,prod domains=all",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=("memory", "generated"),
+        default="memory",
+        help=f"Matrix output: keep in memory (default) or write {MATRIX_DIR}/<env>/<domain>",
+    )
+    parser.add_argument("--jobs", type=int, help="Concurrent matrix renders (default: CPU count)")
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Render in memory and print unified diffs against generated/ (exit 1 on changes)",
+    )
+    parser.add_argument("--rev", help="With --diff, compare against the render at this git revision")
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    configure_tracing("render", args)
+    if not args.matrix and not args.domain:
+        parser.error("--domain is required unless --matrix is given")
 
     try:
-        render(args.domain, args.env, dry_run=args.dry_run, extra_env=args.extra_env)
-    except FileNotFoundError as exc:
+        if args.matrix:
+            envs, domains = parse_matrix(args.matrix, ROOT)
+            failed = render_matrix(
+                envs, domains, sink=args.sink, validate=not args.skip_validation, jobs=args.jobs
+            )
+            sys.exit(1 if failed else 0)
+        if args.diff or args.rev:
+            changed = render_diff(args.domain, args.env, revision=args.rev, validate=not args.skip_validation)
+            sys.exit(1 if changed else 0)
+        render(
+            args.domain,
+            args.env,
+            dry_run=args.dry_run,
+            extra_env=args.extra_env,
+            validate=not args.skip_validation,
+        )
+    except (FileNotFoundError, ValueError) as exc:
         log_warn(str(exc))
         sys.exit(1)
+    except ValidationError as exc:
+        if args.diff or args.rev:
+            log_warn(str(exc))
+        else:
+            log_warn(f"{exc}; nothing written (use --skip-validation to override)")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""Restic restore tool paired with config-registry/env/backup.yml.
+
+Snapshots are resolved from a locally cached index of `restic snapshots --json`,
+so picking a restore point does not scan the repository. Path groups are
+restored concurrently with `restic restore --include` into a staging directory
+next to the target and renamed into place. Database dumps are streamed from
+`restic dump` straight into pg_restore/psql inside the container. Each restored
+tree is checked against the snapshot listing (node type and file size) without
+reading the restored data back; restic already authenticates every blob it
+decrypts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backup import (
+    DEFAULT_CONFIG,
+    DEFAULT_PASSWORD_FILE,
+    DEFAULT_REPOSITORY,
+    BackupError,
+    Database,
+    Profile,
+    Restic,
+    Timings,
+    container_running,
+    load_profile,
+    log_error,
+    log_info,
+    log_warn,
+    postgres_exec,
+    reexec_with_sudo,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+INDEX_DIR = ROOT / "config-registry" / "state" / "restore-index"
+INDEX_TTL = 300  # seconds; snapshot listings older than this are refetched
+CHUNK = 1 << 20
+MAX_REPORTED = 20  # verification mismatches printed per group
+
+
+class RestoreError(Exception):
+    """Raised when a restore task fails."""
+
+
+# ---------------------------------------------------------------------
+# Snapshot index
+# ---------------------------------------------------------------------
+@dataclass
+class Snapshot:
+    id: str
+    time: str
+    host: str
+    tags: List[str] = field(default_factory=list)
+    paths: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Snapshot":
+        return cls(
+            id=str(data.get("id", "")),
+            time=str(data.get("time", "")),
+            host=str(data.get("hostname", "")),
+            tags=[str(t) for t in data.get("tags") or []],
+            paths=[str(p) for p in data.get("paths") or []],
+        )
+
+    @property
+    def short_id(self) -> str:
+        return self.id[:8]
+
+    @property
+    def group(self) -> Optional[str]:
+        return next((tag[len("group:") :] for tag in self.tags if tag.startswith("group:")), None)
+
+    def group_in(self, groups: Dict[str, List[str]]) -> Optional[str]:
+        """The group tag, or for untagged snapshots the group whose paths match exactly."""
+        if self.group is not None:
+            return self.group
+        paths = sorted(self.paths)
+        return next((name for name, group_paths in groups.items() if paths and sorted(group_paths) == paths), None)
+
+
+class SnapshotIndex:
+    """`restic snapshots --json` cached per repository; `restic ls` listings cached per snapshot."""
+
+    def __init__(self, restic: Restic, ttl: float = INDEX_TTL, cache_dir: Path = INDEX_DIR) -> None:
+        self.restic = restic
+        self.ttl = ttl
+        key = hashlib.sha256(restic.env["RESTIC_REPOSITORY"].encode()).hexdigest()[:16]
+        self.path = cache_dir / f"snapshots-{key}.json"
+        self.tree_dir = cache_dir / "trees"
+        self.fresh = False
+
+    def snapshots(self, refresh: bool = False) -> List[Snapshot]:
+        if not refresh:
+            try:
+                cached = json.loads(self.path.read_text())
+                if time.time() - float(cached["fetched_at"]) <= self.ttl:
+                    return [Snapshot.from_json(s) for s in cached["snapshots"]]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        return self.fetch()
+
+    def fetch(self) -> List[Snapshot]:
+        result = self.restic.run("snapshots", "--json", check=False, capture_output=True)
+        if result.returncode != 0:
+            raise RestoreError(f"restic snapshots failed ({result.returncode}): {result.stderr.strip()}")
+        data = json.loads(result.stdout or "[]") or []
+        _write_json(self.path, {"fetched_at": time.time(), "snapshots": data})
+        self.fresh = True
+        return [Snapshot.from_json(s) for s in data]
+
+    def tree(self, snapshot: Snapshot) -> List[Dict[str, Any]]:
+        """File/dir/symlink nodes of a snapshot; snapshots are immutable, so this never expires."""
+        path = self.tree_dir / f"{snapshot.id}.json"
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            pass
+        result = self.restic.run("ls", "--json", snapshot.id, check=False, capture_output=True)
+        if result.returncode != 0:
+            raise RestoreError(f"restic ls {snapshot.short_id} failed: {result.stderr.strip()}")
+        nodes = []
+        for line in result.stdout.splitlines():
+            try:
+                node = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(node, dict) and node.get("struct_type", "node") == "node" and node.get("path"):
+                nodes.append({"path": node["path"], "type": node.get("type"), "size": node.get("size", 0)})
+        _write_json(path, nodes)
+        return nodes
+
+    def resolve(
+        self, selector: str, wanted: Dict[str, List[str]], host: Optional[str], refresh: bool
+    ) -> Dict[str, Snapshot]:
+        """Pick one snapshot per wanted group (label -> paths); a stale cache is refetched before giving up."""
+        chosen = select(self.snapshots(refresh), selector, wanted, host)
+        incomplete = not chosen or (not is_snapshot_id(selector) and len(chosen) < len(wanted))
+        if incomplete and not self.fresh:
+            chosen = select(self.fetch(), selector, wanted, host)
+        return chosen
+
+
+def _write_json(path: Path, data: Any) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(path)
+    except OSError as exc:
+        log_warn(f"[Index] Unable to cache {path.name} ({exc})")
+
+
+DATE_PREFIX = "date:"
+
+
+def is_snapshot_id(selector: str) -> bool:
+    # dates must be explicit: a short id can be all digits too (e.g. 20240101)
+    return selector != "latest" and not selector.startswith(DATE_PREFIX)
+
+
+def check_selector(selector: str) -> None:
+    if selector.startswith(DATE_PREFIX):
+        date = selector[len(DATE_PREFIX) :]
+        if len(date) != 8 or not date.isdigit():
+            raise RestoreError(f"invalid date selector '{selector}' (expected date:YYYYMMDD)")
+
+
+def select(
+    snapshots: List[Snapshot], selector: str, wanted: Dict[str, List[str]], host: Optional[str]
+) -> Dict[str, Snapshot]:
+    """Resolve `latest`, a `date:YYYYMMDD` backup date tag, or a snapshot id (prefix).
+
+    `latest` and dates pick the newest matching snapshot of each wanted group
+    (by `group:` tag, or by paths for untagged snapshots); a snapshot id selects
+    exactly that snapshot, keyed by its group.
+    """
+    if is_snapshot_id(selector):
+        matches = [s for s in snapshots if s.id.startswith(selector)]
+        if len(matches) > 1:
+            raise RestoreError(f"snapshot id '{selector}' is ambiguous ({len(matches)} matches)")
+        return {(matches[0].group_in(wanted) or "snapshot"): matches[0]} if matches else {}
+    chosen: Dict[str, Snapshot] = {}
+    for snapshot in sorted(snapshots, key=lambda s: s.time):
+        if host and snapshot.host != host:
+            continue
+        if selector != "latest" and selector[len(DATE_PREFIX) :] not in snapshot.tags:
+            continue
+        group = snapshot.group_in(wanted)
+        if group is not None and group in wanted:
+            chosen[group] = snapshot
+    return chosen
+
+
+# ---------------------------------------------------------------------
+# Tasks
+# ---------------------------------------------------------------------
+# groups share top-level directories (srv/, etc/), so merges into the target
+# are serialized
+_MERGE_LOCK = threading.Lock()
+
+
+class MergeJournal:
+    """Undo log for one group's merge, so a failed group leaves the target as it was.
+
+    Replaced entries are renamed aside (same directory, so same filesystem) and
+    only deleted by commit().
+    """
+
+    def __init__(self) -> None:
+        self.actions: List[Tuple[Path, Optional[Path]]] = []  # (dst, aside copy of what it replaced)
+
+    def commit(self) -> None:
+        for _, aside in self.actions:
+            if aside is not None:
+                _remove(aside)
+        self.actions.clear()
+
+    def rollback(self) -> None:
+        for dst, aside in reversed(self.actions):
+            _remove(dst)
+            if aside is not None:
+                os.replace(aside, dst)
+        self.actions.clear()
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _copy_ownership(src: Path, dst: Path) -> None:
+    """copytree/copy2 keep modes and times but not owners; restic restores owners as root."""
+    if os.geteuid() != 0:
+        return
+    pairs = [(src, dst)]
+    if src.is_dir() and not src.is_symlink():
+        for dirpath, dirnames, filenames in os.walk(src):
+            rel = Path(dirpath).relative_to(src)
+            pairs.extend((Path(dirpath) / n, dst / rel / n) for n in dirnames + filenames)
+    for a, b in pairs:
+        st = a.lstat()
+        os.lchown(b, st.st_uid, st.st_gid)
+
+
+def move_entry(src: Path, dst: Path) -> None:
+    """Rename src to dst; across filesystems (EXDEV) copy next to dst first, then rename."""
+    try:
+        os.replace(src, dst)
+        return
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+    tmp = dst.with_name(f".{dst.name}.restore-tmp")
+    _remove(tmp)
+    try:
+        if src.is_dir() and not src.is_symlink():
+            shutil.copytree(src, tmp, symlinks=True)
+        else:
+            shutil.copy2(src, tmp, follow_symlinks=False)
+        _copy_ownership(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        _remove(tmp)
+        raise
+    _remove(src)
+
+
+def merge_into(src: Path, dst: Path, journal: MergeJournal) -> None:
+    """Move src onto dst, replacing what is already there; every change is journaled."""
+    if not dst.exists() and not dst.is_symlink():
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        move_entry(src, dst)
+        journal.actions.append((dst, None))
+        return
+    if src.is_dir() and not src.is_symlink() and dst.is_dir() and not dst.is_symlink():
+        for child in list(src.iterdir()):
+            merge_into(child, dst / child.name, journal)
+        shutil.copystat(src, dst)
+        src.rmdir()
+        return
+    aside = dst.with_name(f".{dst.name}.restore-old")
+    _remove(aside)
+    os.replace(dst, aside)
+    journal.actions.append((dst, aside))
+    move_entry(src, dst)
+
+
+def _covered(path: str, includes: Sequence[str]) -> bool:
+    return not includes or any(path == inc or path.startswith(inc.rstrip("/") + "/") for inc in includes)
+
+
+def verify_tree(nodes: List[Dict[str, Any]], target: Path, includes: Sequence[str]) -> List[str]:
+    """Compare restored nodes with the snapshot listing by type and size (stat only)."""
+    problems = []
+    for node in nodes:
+        path = str(node["path"])
+        if not _covered(path, includes):
+            continue
+        local = target / path.lstrip("/")
+        try:
+            st = local.lstat()
+        except OSError:
+            problems.append(f"{path}: missing")
+            continue
+        kind = node.get("type")
+        if kind == "file":
+            if not local.is_file() or local.is_symlink():
+                problems.append(f"{path}: expected a file")
+            elif st.st_size != int(node.get("size") or 0):
+                problems.append(f"{path}: size {st.st_size} != {node.get('size')}")
+        elif kind == "dir" and not local.is_dir():
+            problems.append(f"{path}: expected a directory")
+        elif kind == "symlink" and not local.is_symlink():
+            problems.append(f"{path}: expected a symlink")
+    return problems
+
+
+def restore_group(
+    restic: Restic,
+    index: SnapshotIndex,
+    group: str,
+    snapshot: Snapshot,
+    includes: Sequence[str],
+    target: Path,
+    verify: bool,
+    timings: Timings,
+) -> None:
+    staging = target / f".restore-{group.replace(':', '-')}.partial"
+    if staging.exists():
+        shutil.rmtree(staging)
+    args = ["restore", snapshot.id, "--target", str(staging)]
+    for include in includes:
+        args += ["--include", include]
+    log_info(f"[Restore] {group}: snapshot {snapshot.short_id} ({snapshot.time[:19]}) {' '.join(includes)}")
+    started = time.monotonic()
+    journal = MergeJournal()
+    try:
+        result = restic.run(*args, check=False, capture_output=True)
+        if result.returncode != 0:
+            raise RestoreError(f"{group}: restic restore failed ({result.returncode}): {result.stderr.strip()}")
+        with _MERGE_LOCK:
+            for entry in list(staging.iterdir()) if staging.exists() else []:
+                merge_into(entry, target / entry.name, journal)
+        if verify:
+            problems = verify_tree(index.tree(snapshot), target, includes)
+            for problem in problems[:MAX_REPORTED]:
+                log_error(f"[Verify] {group}: {problem}")
+            if problems:
+                raise RestoreError(f"{group}: {len(problems)} restored path(s) do not match the snapshot")
+        journal.commit()
+    except (RestoreError, OSError):
+        timings.task(group, time.monotonic() - started, False, snapshot.id)
+        if journal.actions:
+            log_warn(f"[Restore] {group}: rolling back {len(journal.actions)} merged path(s)")
+            try:
+                with _MERGE_LOCK:
+                    journal.rollback()
+            except OSError as exc:
+                log_error(f"[Restore] {group}: rollback failed, target is partially merged ({exc})")
+        raise
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+    timings.task(group, time.monotonic() - started, True, snapshot.id)
+    log_info(f"[Restore] {group}: done{' and verified' if verify else ''}")
+
+
+def postgres_restore_command(db: Database) -> List[str]:
+    """`docker exec -i ... pg_restore` (custom format) or psql (plain SQL) reading stdin."""
+    if db.restore_command:
+        return list(db.restore_command)
+    exec_cmd, user = postgres_exec(db, stdin=True)
+    if db.format == "custom":
+        # stdin is not seekable, so no -j; --clean replaces objects that already exist
+        return exec_cmd + ["pg_restore", "-U", user, "--no-password", "--clean", "--if-exists", "--no-owner", "-d", db.database]
+    return exec_cmd + ["psql", "-U", user, "--no-password", "-v", "ON_ERROR_STOP=1", "-d", db.database]
+
+
+def _read_and_close(handle: Any) -> str:
+    with handle:
+        handle.seek(0)
+        return handle.read().decode(errors="replace")
+
+
+def restore_database(
+    restic: Restic,
+    index: SnapshotIndex,
+    db: Database,
+    snapshot: Snapshot,
+    target: Path,
+    into_container: bool,
+    verify: bool,
+    timings: Timings,
+) -> None:
+    """Stream `restic dump` into the container (or to <target>/db/), counting bytes on the way."""
+    name = f"db:{db.name}"
+    if into_container and db.restore_command is None and not container_running(db.container):
+        raise RestoreError(f"{name}: {db.container} container not running")
+    source = restic.command("dump", snapshot.id, f"/{db.filename}")
+    started = time.monotonic()
+    # stderr goes to files: a pipe nobody reads while the data streams can fill and stall both ends
+    dump_errfile = tempfile.TemporaryFile()
+    sink_errfile = tempfile.TemporaryFile()
+    dump = subprocess.Popen(source, stdout=subprocess.PIPE, stderr=dump_errfile, env=restic.env)
+    assert dump.stdout is not None
+    sink: Optional[subprocess.Popen] = None
+    out_file = target / "db" / db.filename
+    copied = 0
+    try:
+        if into_container:
+            log_info(f"[Restore] {name}: snapshot {snapshot.short_id} → {db.container}/{db.database}")
+            sink = subprocess.Popen(postgres_restore_command(db), stdin=subprocess.PIPE, stderr=sink_errfile)
+            assert sink.stdin is not None
+            writer = sink.stdin
+        else:
+            log_info(f"[Restore] {name}: snapshot {snapshot.short_id} → {out_file}")
+            out_file.parent.mkdir(parents=True, exist_ok=True)
+            writer = out_file.open("wb")
+        with writer:
+            while True:
+                chunk = dump.stdout.read(CHUNK)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                copied += len(chunk)
+    except BrokenPipeError:
+        pass  # the restore process exited early; its status is reported below
+    finally:
+        dump.stdout.close()
+        dump_rc = dump.wait()
+    sink_rc = sink.wait() if sink else 0
+    dump_err, sink_err = _read_and_close(dump_errfile), _read_and_close(sink_errfile)
+
+    ok = dump_rc == 0 and sink_rc == 0
+    error = ""
+    if dump_rc != 0:
+        error = f"restic dump failed ({dump_rc}): {dump_err.strip()}"
+    elif sink_rc != 0:
+        error = f"restore into {db.container} failed ({sink_rc}): {sink_err.strip()}"
+    elif verify:
+        expected = next((n.get("size") for n in index.tree(snapshot) if n["path"] == f"/{db.filename}"), None)
+        if expected is not None and int(expected) != copied:
+            ok, error = False, f"streamed {copied} bytes, snapshot has {expected}"
+    timings.task(name, time.monotonic() - started, ok, snapshot.id)
+    if not ok:
+        raise RestoreError(f"{name}: {error}")
+    log_info(f"[Restore] {name}: {copied / 1e6:.1f} MB restored{' and verified' if verify else ''}")
+
+
+# ---------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------
+def _split(values: Optional[List[str]]) -> List[str]:
+    return [v for value in values or [] for v in value.split(",") if v]
+
+
+def plan(profile: Profile, args: argparse.Namespace) -> Dict[str, Any]:
+    groups = _split(args.group)
+    databases = _split(args.database)
+    if not groups and not databases:
+        groups, databases = list(profile.groups), [db.name for db in profile.databases]
+    unknown = [g for g in groups if g not in profile.groups] + [
+        d for d in databases if d not in {db.name for db in profile.databases}
+    ]
+    if unknown:
+        raise RestoreError(f"not in profile '{profile.name}': {', '.join(unknown)}")
+    return {
+        "groups": {g: profile.groups[g] for g in groups},
+        "databases": [db for db in profile.databases if db.name in databases],
+    }
+
+
+def run_restore(profile: Profile, restic: Restic, index: SnapshotIndex, args: argparse.Namespace) -> int:
+    timings = Timings()
+    check_selector(args.snapshot)
+    selected = plan(profile, args)
+    wanted = dict(selected["groups"])
+    wanted.update({f"db:{db.name}": [f"/{db.filename}"] for db in selected["databases"]})
+
+    with timings.phase("index"):
+        chosen = index.resolve(args.snapshot, wanted, args.host, args.refresh)
+    if not chosen:
+        log_error(f"[Index] No snapshot matches '{args.snapshot}' (see --list)")
+        if len(args.snapshot) == 8 and args.snapshot.isdigit():
+            log_error(f"[Index] To select by backup date, use date:{args.snapshot}")
+        return 1
+
+    def includes_for(paths: List[str]) -> List[str]:
+        return [p for p in _split(args.include) if _covered(p, paths)] if args.include else paths
+
+    tasks: List[Any] = []
+    missing: List[str] = []
+    if is_snapshot_id(args.snapshot):
+        # one explicit snapshot, whatever the group selection; untagged ones are restored whole
+        label, snapshot = next(iter(chosen.items()))
+        db = next((d for d in profile.databases if f"db:{d.name}" == label), None)
+        if db is not None:
+            tasks.append(("db", db, snapshot, []))
+        else:
+            tasks.append(("group", label, snapshot, includes_for(profile.groups.get(label, []))))
+    else:
+        for group, paths in selected["groups"].items():
+            if group not in chosen:
+                log_warn(f"[Index] No snapshot for group '{group}' matches '{args.snapshot}'")
+                missing.append(group)
+                continue
+            includes = includes_for(paths)
+            if includes:
+                tasks.append(("group", group, chosen[group], includes))
+        for db in selected["databases"]:
+            if f"db:{db.name}" not in chosen:
+                log_warn(f"[Index] No snapshot for database '{db.name}' matches '{args.snapshot}'")
+                missing.append(f"db:{db.name}")
+                continue
+            tasks.append(("db", db, chosen[f"db:{db.name}"], []))
+
+    target = Path(args.target or f"/srv/restores/{args.snapshot.replace(':', '-')}").resolve()
+    for kind, item, snapshot, includes in tasks:
+        label = item if kind == "group" else f"db:{item.name}"
+        print(f"  {label:<24} {snapshot.short_id}  {snapshot.time[:19]}  {snapshot.host}  {' '.join(includes)}")
+    if args.dry_run:
+        return 0
+
+    workers = args.workers or profile.workers
+    log_info(f"[Restore] {len(tasks)} task(s) into {target} with {workers} worker(s)")
+    target.mkdir(parents=True, exist_ok=True)
+    failures: List[str] = []
+    with timings.phase("restore"):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for kind, item, snapshot, includes in tasks:
+                if kind == "group":
+                    futures[item] = pool.submit(
+                        restore_group, restic, index, item, snapshot, includes, target, args.verify, timings
+                    )
+                else:
+                    futures[f"db:{item.name}"] = pool.submit(
+                        restore_database, restic, index, item, snapshot, target, args.into_container, args.verify, timings
+                    )
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except (RestoreError, OSError) as exc:
+                    log_error(f"[Restore] {exc}")
+                    failures.append(name)
+
+    timings.summary()
+    if args.timings_json:
+        args.timings_json.write_text(json.dumps(timings.as_dict(), indent=2) + "\n")
+    if failures:
+        log_error(f"Restore failed for: {', '.join(failures)}")
+        return 1
+    if missing:
+        log_warn(f"[Done] Restored into {target}, but no snapshot matched: {', '.join(missing)}")
+        return 1
+    log_info(f"[Done] Restore complete → {target}")
+    return 0
+
+
+def list_snapshots(index: SnapshotIndex, args: argparse.Namespace) -> int:
+    snapshots = index.snapshots(args.refresh)
+    for snapshot in sorted(snapshots, key=lambda s: s.time):
+        if args.host and snapshot.host != args.host:
+            continue
+        print(
+            f"{snapshot.short_id}  {snapshot.time[:19]}  {snapshot.host:<16} {snapshot.group or '-':<20} "
+            f"{','.join(t for t in snapshot.tags if not t.startswith('group:'))}"
+        )
+    return 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parallel, verified restic restore driven by backup.yml")
+    parser.add_argument("snapshot", nargs="?", default="latest", help="latest, date:YYYYMMDD, or a snapshot id")
+    parser.add_argument("--target", help="Restore root (default: /srv/restores/<snapshot>; '/' restores in place)")
+    parser.add_argument("--group", action="append", help="Path group(s) to restore (comma-separated; default: all)")
+    parser.add_argument("--database", action="append", help="Database dump(s) to restore (comma-separated)")
+    parser.add_argument("--include", action="append", help="Only restore these paths (comma-separated)")
+    parser.add_argument(
+        "--into-container",
+        action="store_true",
+        help="Stream database dumps into pg_restore/psql in their container instead of <target>/db/",
+    )
+    parser.add_argument("--no-verify", dest="verify", action="store_false", help="Skip the post-restore check")
+    parser.add_argument("--list", action="store_true", help="List snapshots from the index and exit")
+    parser.add_argument("--dry-run", action="store_true", help="Show the snapshots that would be restored")
+    parser.add_argument("--refresh", action="store_true", help="Refetch the snapshot index")
+    parser.add_argument("--index-ttl", type=float, default=INDEX_TTL, help="Seconds before the index is refetched")
+    parser.add_argument("--index-dir", type=Path, default=INDEX_DIR, help="Snapshot index cache directory")
+    parser.add_argument("--config", type=Path, default=Path(os.environ.get("BACKUP_CONFIG", DEFAULT_CONFIG)))
+    parser.add_argument("--profile", default="full", help="Profile in backup.yml")
+    parser.add_argument("--repo", default=os.environ.get("RESTIC_REPOSITORY", DEFAULT_REPOSITORY))
+    parser.add_argument(
+        "--password-file", default=os.environ.get("RESTIC_PASSWORD_FILE", str(DEFAULT_PASSWORD_FILE))
+    )
+    parser.add_argument("--host", help="Only consider snapshots from this host")
+    parser.add_argument("--restic", default="restic", help="restic binary")
+    parser.add_argument("--workers", type=int, help="Concurrent restore tasks (overrides the profile)")
+    parser.add_argument("--timings-json", type=Path, help="Write per-phase timings to this file")
+    parser.add_argument("--no-sudo", action="store_true", help="Do not re-exec under sudo when not root")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = list(argv if argv is not None else sys.argv[1:])
+    args = parse_args(argv)
+    if os.geteuid() != 0 and not args.no_sudo:
+        reexec_with_sudo(argv, Path(__file__).resolve())
+
+    if not shutil.which(args.restic):
+        log_error(f"Missing dependency: {args.restic}")
+        return 1
+    password_file = Path(args.password_file)
+    if not password_file.is_absolute():
+        password_file = ROOT / password_file
+    if not password_file.exists():
+        log_error(f"Restic password file not found: {password_file}")
+        return 1
+
+    restic = Restic(args.restic, args.repo, str(password_file), host="", tags=[])
+    index = SnapshotIndex(restic, ttl=args.index_ttl, cache_dir=args.index_dir)
+    try:
+        if args.list:
+            return list_snapshots(index, args)
+        profile = load_profile(args.config, args.profile, for_restore=True)
+        log_info(f"[Restore] Restoring '{args.snapshot}' from {args.repo}")
+        return run_restore(profile, restic, index, args)
+    except (BackupError, RestoreError) as exc:
+        log_error(str(exc))
+        return 1
+    except KeyboardInterrupt:
+        log_error("Restore interrupted")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""Container status for rendered domains via the Docker Engine API.
+
+Talks HTTP to the Docker daemon over its Unix socket (DOCKER_HOST=unix://...
+or /var/run/docker.sock) on one keep-alive connection. A single
+`GET /containers/json?all=1` returns every container, which is mapped to a
+domain by its compose labels (config file under generated/<domain>/, then
+project name) and, for containers started outside compose, by the networks
+recorded in the metadata cache. Replaces per-domain `docker compose ps` calls.
+
+Standard library only (PyYAML is loaded only for the network fallback and
+dependency checks).
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import http.client
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import quote, urlencode
+
+ROOT = Path(__file__).resolve().parents[1]
+DOMAINS_FILE = ROOT / "config-registry" / "env" / "domains.yml"
+DEFAULT_SOCKET = "/var/run/docker.sock"
+TIMEOUT = 10.0
+
+
+def log_info(message: str) -> None:
+    print(f"[status] {message}")
+
+
+def log_warn(message: str) -> None:
+    print(f"[status][warn] {message}", file=sys.stderr)
+
+
+class DockerError(Exception):
+    """Raised when the Docker API is unreachable or returns an error."""
+
+
+# ---------------------------------------------------------------------
+# Docker Engine API client
+# ---------------------------------------------------------------------
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = TIMEOUT) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def socket_path(value: Optional[str] = None) -> str:
+    host = value or os.environ.get("DOCKER_HOST") or f"unix://{DEFAULT_SOCKET}"
+    if host.startswith("unix://"):
+        return host[len("unix://") :]
+    if "://" in host:
+        raise DockerError(f"DOCKER_HOST={host} is not a Unix socket; only unix:// is supported")
+    return host
+
+
+class DockerClient:
+    """Minimal Engine API client; requests share one keep-alive connection."""
+
+    def __init__(self, path: Optional[str] = None, timeout: float = TIMEOUT) -> None:
+        self.host = path
+        self.timeout = timeout
+        self._conn: Optional[UnixHTTPConnection] = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get(self, path: str, **params: Any) -> Any:
+        url = f"{path}?{urlencode(params)}" if params else path
+        with self._lock:
+            for attempt in (1, 2):
+                if self._conn is None:
+                    self._conn = UnixHTTPConnection(socket_path(self.host), self.timeout)
+                try:
+                    self._conn.request("GET", url, headers={"Host": "docker"})
+                    response = self._conn.getresponse()
+                    body = response.read()
+                    break
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as exc:
+                    self.close()  # the daemon closed an idle keep-alive connection; retry once
+                    if attempt == 2:
+                        raise DockerError(f"Docker API connection lost ({exc})") from exc
+                except OSError as exc:
+                    self.close()
+                    raise DockerError(f"Cannot reach the Docker API at {socket_path(self.host)} ({exc})") from exc
+        return _decode(response.status, body, url)
+
+    def stream(self, path: str, **params: Any) -> http.client.HTTPResponse:
+        """Open a long-lived response (logs) on its own connection."""
+        conn = UnixHTTPConnection(socket_path(self.host), timeout=None)
+        url = f"{path}?{urlencode(params)}" if params else path
+        try:
+            conn.request("GET", url, headers={"Host": "docker"})
+            response = conn.getresponse()
+        except OSError as exc:
+            raise DockerError(f"Cannot reach the Docker API at {conn.socket_path} ({exc})") from exc
+        if response.status >= 400:
+            _decode(response.status, response.read(), url)
+        return response
+
+    def containers(self) -> List[Dict[str, Any]]:
+        return self.get("/containers/json", all=1) or []
+
+
+def _decode(status: int, body: bytes, url: str) -> Any:
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if status >= 400:
+        message = data.get("message") if isinstance(data, dict) else body.decode(errors="replace").strip()
+        raise DockerError(f"GET {url} returned {status}: {message}")
+    return data
+
+
+# ---------------------------------------------------------------------
+# Domain mapping
+# ---------------------------------------------------------------------
+@dataclass
+class Container:
+    id: str
+    name: str
+    service: str
+    project: str
+    image: str
+    state: str
+    status: str
+    health: str
+    networks: List[str] = field(default_factory=list)
+    ports: List[str] = field(default_factory=list)
+    domain: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "Container":
+        labels = data.get("Labels") or {}
+        status = str(data.get("Status") or "")
+        health = ""
+        for marker in ("unhealthy", "healthy", "health: starting"):
+            if f"({marker})" in status:
+                health = "starting" if marker == "health: starting" else marker
+                break
+        ports = []
+        for port in data.get("Ports") or []:
+            if port.get("PublicPort"):
+                ports.append(f"{port.get('IP', '')}:{port['PublicPort']}->{port.get('PrivatePort')}/{port.get('Type', 'tcp')}")
+        return cls(
+            id=str(data.get("Id", ""))[:12],
+            name=str((data.get("Names") or ["?"])[0]).lstrip("/"),
+            service=str(labels.get("com.docker.compose.service", "")),
+            project=str(labels.get("com.docker.compose.project", "")),
+            image=str(data.get("Image", "")),
+            state=str(data.get("State", "")),
+            status=status,
+            health=health,
+            networks=sorted(((data.get("NetworkSettings") or {}).get("Networks") or {}).keys()),
+            ports=sorted(set(ports)),
+        )
+
+
+def known_domains(root: Path = ROOT) -> List[str]:
+    """Domains that are rendered or have a metadata cache entry."""
+    names = {p.parent.name for p in (root / "generated").glob("*/compose.yml")}
+    names |= {p.stem for p in (root / "config-registry" / "state" / "metadata-cache").glob("*.yml")}
+    return sorted(names)
+
+
+def network_index(root: Path = ROOT) -> Dict[str, str]:
+    """Network name -> domain, for networks with a single owner in the metadata cache."""
+    import yaml  # type: ignore[import]  # only needed for containers without compose labels
+
+    owners: Dict[str, set] = {}
+    for path in (root / "config-registry" / "state" / "metadata-cache").glob("*.yml"):
+        try:
+            data = yaml.safe_load(path.read_text()) or {}
+        except (OSError, yaml.YAMLError):
+            continue
+        for network in data.get("networks") or []:
+            owners.setdefault(str(network), set()).add(path.stem)
+    index = {}
+    for network, domains in owners.items():
+        if len(domains) == 1:
+            index[network] = next(iter(domains))
+        elif network.endswith("-network") and network[: -len("-network")] in domains:
+            index[network] = network[: -len("-network")]  # shared, but named after its owner
+    return index
+
+
+def compose_domain(labels: Dict[str, str], root: Path = ROOT) -> Optional[str]:
+    """Domain from the compose config file label (generated/<domain>/compose.yml)."""
+    for config in (labels.get("com.docker.compose.project.config_files") or "").split(","):
+        path = Path(config.strip())
+        if path.name and path.parent.parent.name == "generated":
+            return path.parent.name
+    return None
+
+
+def map_domains(raw: List[Dict[str, Any]], root: Path = ROOT) -> List[Container]:
+    known = set(known_domains(root))
+    containers = []
+    unmatched = []
+    for data in raw:
+        container = Container.from_api(data)
+        domain = compose_domain(data.get("Labels") or {}, root)
+        if domain is None and container.project in known:
+            domain = container.project
+        container.domain = domain
+        containers.append(container)
+        if domain is None:
+            unmatched.append(container)
+    if unmatched:
+        networks = network_index(root)
+        for container in unmatched:
+            for network in container.networks:
+                # compose prefixes networks with the project name ("<project>_<name>")
+                bare = network.split("_", 1)[1] if container.project and network.startswith(f"{container.project}_") else network
+                if bare in networks:
+                    container.domain = networks[bare]
+                    break
+    return containers
+
+
+def summarize(domain: str, containers: List[Container], root: Path = ROOT) -> Dict[str, Any]:
+    running = [c for c in containers if c.state == "running"]
+    unhealthy = sorted(c.name for c in containers if c.health == "unhealthy")
+    if not containers:
+        state = "not deployed"
+    elif len(running) == len(containers):
+        state = "degraded" if unhealthy else "up"
+    elif running:
+        state = "partial"
+    else:
+        state = "down"
+    return {
+        "domain": domain,
+        "rendered": (root / "generated" / domain / "compose.yml").exists(),
+        "state": state,
+        "containers": len(containers),
+        "running": len(running),
+        "unhealthy": unhealthy,
+    }
+
+
+def collect(client: DockerClient, root: Path = ROOT) -> Dict[str, Any]:
+    """Status of every known domain from one container listing."""
+    containers = map_domains(client.containers(), root)
+    by_domain: Dict[str, List[Container]] = {domain: [] for domain in known_domains(root)}
+    unmapped = []
+    for container in containers:
+        if container.domain is None:
+            unmapped.append(container)
+        else:
+            by_domain.setdefault(container.domain, []).append(container)
+    domains = {}
+    for domain, members in sorted(by_domain.items()):
+        entry = summarize(domain, members, root)
+        entry["items"] = [asdict(c) for c in sorted(members, key=lambda c: c.name)]
+        domains[domain] = entry
+    return {
+        "generated_at": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "domains": domains,
+        "unmapped": [asdict(c) for c in unmapped],
+    }
+
+
+# ---------------------------------------------------------------------
+# Logs
+# ---------------------------------------------------------------------
+MULTIPLEXED = "application/vnd.docker.multiplexed-stream"
+
+
+def is_multiplexed(client: DockerClient, container: Container, response: http.client.HTTPResponse) -> bool:
+    """Whether log output is framed (non-TTY). API >= 1.42 says so in the content
+    type; older daemons send raw-stream for both, so ask the container config."""
+    if (response.getheader("Content-Type") or "").startswith(MULTIPLEXED):
+        return True
+    info = client.get(f"/containers/{quote(container.id)}/json") or {}
+    return not (info.get("Config") or {}).get("Tty", False)
+
+
+def demux(response: http.client.HTTPResponse, multiplexed: bool = True) -> Iterator[bytes]:
+    """Yield payloads of the stdout/stderr stream; TTY containers send raw output."""
+    if not multiplexed:
+        yield from iter(lambda: response.read1(65536), b"")
+        return
+    while True:
+        header = response.read(8)
+        if len(header) < 8:
+            return
+        _, size = struct.unpack(">BxxxL", header)
+        yield response.read(size)
+
+
+def follow_logs(client: DockerClient, containers: List[Container], follow: bool, tail: str) -> int:
+    width = max((len(c.service or c.name) for c in containers), default=0)
+    print_lock = threading.Lock()
+
+    def pump(container: Container) -> None:
+        label = (container.service or container.name).ljust(width)
+        try:
+            response = client.stream(
+                f"/containers/{quote(container.id)}/logs",
+                stdout=1,
+                stderr=1,
+                follow=int(follow),
+                tail=tail,
+            )
+            multiplexed = is_multiplexed(client, container, response)
+        except DockerError as exc:
+            log_warn(f"{container.name}: {exc}")
+            return
+        pending = b""
+        for chunk in demux(response, multiplexed):
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            with print_lock:
+                for line in lines:
+                    print(f"{label} | {line.decode(errors='replace')}", flush=True)
+        if pending:
+            with print_lock:
+                print(f"{label} | {pending.decode(errors='replace')}", flush=True)
+
+    threads = [threading.Thread(target=pump, args=(c,), daemon=True) for c in containers]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+# ---------------------------------------------------------------------
+# Dependencies
+# ---------------------------------------------------------------------
+def declared_dependents(domain: str, path: Path = DOMAINS_FILE) -> List[str]:
+    import yaml  # type: ignore[import]
+
+    data = yaml.safe_load(path.read_text()) if path.exists() else {}
+    domains = (data or {}).get("domains") or []
+    return sorted(str(d["name"]) for d in domains if d.get("name") and domain in (d.get("requires") or []))
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+def print_table(report: Dict[str, Any], domains: List[str]) -> None:
+    print(f"{'DOMAIN':<28} {'STATE':<13} {'RUNNING':>7}  UNHEALTHY")
+    for name in domains:
+        entry = report["domains"].get(name) or summarize(name, [])
+        print(
+            f"{name:<28} {entry['state']:<13} {entry['running']:>3}/{entry['containers']:<3}  "
+            f"{', '.join(entry['unhealthy']) or '-'}"
+        )
+    if report["unmapped"] and set(domains) == set(report["domains"]):
+        print(f"({len(report['unmapped'])} container(s) not mapped to a domain)")
+
+
+def cmd_status(client: DockerClient, args: argparse.Namespace) -> int:
+    report = collect(client)
+    domains = args.domains or sorted(report["domains"])
+    if args.json:
+        subset = {d: report["domains"].get(d) or summarize(d, []) for d in domains}
+        print(json.dumps(dict(report, domains=subset), indent=2))
+        return 0
+    print_table(report, domains)
+    return 0
+
+
+def cmd_ps(client: DockerClient, args: argparse.Namespace) -> int:
+    report = collect(client)
+    entry = report["domains"].get(args.domain) or dict(summarize(args.domain, []), items=[])
+    if args.json:
+        print(json.dumps(entry, indent=2))
+        return 0
+    if not entry["items"]:
+        log_info(f"No containers for {args.domain}")
+        return 0
+    print(f"{'NAME':<32} {'SERVICE':<20} {'STATE':<10} {'STATUS':<28} PORTS")
+    for item in entry["items"]:
+        print(f"{item['name']:<32} {item['service']:<20} {item['state']:<10} {item['status']:<28} {', '.join(item['ports'])}")
+    return 0
+
+
+def cmd_logs(client: DockerClient, args: argparse.Namespace) -> int:
+    containers = [c for c in map_domains(client.containers()) if c.domain == args.domain]
+    if args.service:
+        containers = [c for c in containers if c.service in args.service]
+    if not containers:
+        log_warn(f"No containers for {args.domain}")
+        return 1
+    return follow_logs(client, containers, follow=args.follow, tail=args.tail)
+
+
+def cmd_dependents(client: DockerClient, args: argparse.Namespace) -> int:
+    """Print domains that require args.domain (with --running, only those with running containers)."""
+    declared = declared_dependents(args.domain)
+    if not declared:
+        return 0
+    if not args.running:
+        print(" ".join(declared))
+        return 0
+    try:
+        report = collect(client)
+    except DockerError as exc:
+        log_warn(f"{exc}; treating every declared dependent as running")
+        print(" ".join(declared))
+        return 0
+    running = [d for d in declared if (report["domains"].get(d) or {}).get("running")]
+    if running:
+        print(" ".join(running))
+    return 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Domain container status from the Docker Engine API")
+    parser.add_argument("--socket", help="Docker socket (default: DOCKER_HOST or /var/run/docker.sock)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    status = sub.add_parser("status", help="Status of every domain (one API request)")
+    status.add_argument("domains", nargs="*", help="Limit to these domains")
+    status.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    ps = sub.add_parser("ps", help="Containers of one domain")
+    ps.add_argument("domain")
+    ps.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    logs = sub.add_parser("logs", help="Logs of one domain's containers")
+    logs.add_argument("domain")
+    logs.add_argument("--service", action="append", help="Only these compose services")
+    logs.add_argument("--follow", "-f", action="store_true", help="Keep streaming")
+    logs.add_argument("--tail", default="100", help="Lines per container ('all' for everything)")
+
+    dependents = sub.add_parser("dependents", help="Domains that require DOMAIN (from domains.yml)")
+    dependents.add_argument("domain")
+    dependents.add_argument("--running", action="store_true", help="Only dependents with running containers")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(list(argv if argv is not None else sys.argv[1:]))
+    handlers = {"status": cmd_status, "ps": cmd_ps, "logs": cmd_logs, "dependents": cmd_dependents}
+    client = DockerClient(args.socket)
+    try:
+        return handlers[args.command](client, args)
+    except DockerError as exc:
+        log_warn(str(exc))
+        return 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
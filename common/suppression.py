@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""Alert suppression store CLI (suppress, release, list, export, migrate).
+
+Suppression windows live in a single JSON file keyed by domain. Every mutation
+is one locked write followed by a textfile export, so bulk operations (for
+example suppressing every runner during deploy-all) cost one write instead of
+one marker file per domain plus a directory rescan.
+
+Standard library only: the monitoring exporter container runs this file as-is.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import fcntl
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+SUPPRESSION_DIR = Path(os.environ.get("ALERT_SUPPRESSION_DIR") or "/srv/monitoring/alert-suppression")
+TEXTFILE_DIR = Path(os.environ.get("NODE_EXPORTER_TEXTFILE_DIR") or "/srv/monitoring/node-exporter/textfile")
+STORE_NAME = "suppressions.json"
+METRICS_NAME = "alert_suppression.prom"
+
+# Always exported (as 0 when not suppressed) so alert rules never see absent series
+DEFAULT_TARGETS = (
+    "woodpecker",
+    "woodpecker-runner",
+    "forgejo-actions-runner",
+    "github-actions-runner",
+)
+RUNNER_PATTERN = re.compile(r"(runner|actions-runner|woodpecker)")
+
+_DURATION = re.compile(r"^(\d+)([smhd]?)$")
+_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def log_info(message: str) -> None:
+    print(f"[suppression] {message}")
+
+
+def log_warn(message: str) -> None:
+    print(f"[suppression][warn] {message}", file=sys.stderr)
+
+
+def parse_duration(value: str) -> int:
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration '{value}' (expected e.g. 90s, 30m, 2h, 1d)")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def format_timestamp(value: Optional[float]) -> str:
+    if value is None:
+        return "never"
+    return dt.datetime.fromtimestamp(value, dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def is_runner(domain: str) -> bool:
+    return bool(RUNNER_PATTERN.search(domain))
+
+
+class SuppressionStore:
+    """Indexed suppression windows: {domain: {reason, created_at, expires_at}}."""
+
+    def __init__(self, directory: Path = SUPPRESSION_DIR) -> None:
+        self.directory = directory
+        self.path = directory / STORE_NAME
+        self.lock_path = directory / f".{STORE_NAME}.lock"
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> "SuppressionStore":
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            data = {}
+        except ValueError:
+            log_warn(f"{self.path} is not valid JSON; starting from an empty store")
+            data = {}
+        entries = data.get("suppressions", {}) if isinstance(data, dict) else {}
+        self.entries = {str(k): v for k, v in entries.items() if isinstance(v, dict)}
+        return self
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = {"version": 1, "suppressions": dict(sorted(self.entries.items()))}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, indent=2) + "\n")
+        os.replace(tmp, self.path)
+
+    @contextmanager
+    def transaction(self) -> Iterator["SuppressionStore"]:
+        """Load, mutate and save the store under an exclusive flock."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.load()
+                before = json.dumps(self.entries, sort_keys=True)
+                yield self
+                self.prune()
+                if json.dumps(self.entries, sort_keys=True) != before:
+                    self.save()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def suppress(
+        self, domains: Iterable[str], reason: str, ttl: Optional[int], now: float, keep_existing: bool = False
+    ) -> List[str]:
+        added = []
+        active = self.active(now) if keep_existing else {}
+        for domain in domains:
+            if domain in active:
+                continue
+            self.entries[domain] = {
+                "reason": reason,
+                "created_at": now,
+                "expires_at": now + ttl if ttl else None,
+            }
+            added.append(domain)
+        return added
+
+    def release(self, domains: Iterable[str], reason: Optional[str] = None) -> List[str]:
+        released = []
+        for domain in domains:
+            entry = self.entries.get(domain)
+            if entry is None or (reason is not None and entry.get("reason") != reason):
+                continue
+            del self.entries[domain]
+            released.append(domain)
+        return released
+
+    def prune(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        expired = [name for name, entry in self.entries.items() if self._expired(entry, now)]
+        for name in expired:
+            del self.entries[name]
+        return expired
+
+    def active(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        now = time.time() if now is None else now
+        return {name: entry for name, entry in self.entries.items() if not self._expired(entry, now)}
+
+    def next_expiry(self, now: Optional[float] = None) -> Optional[float]:
+        expiries = [
+            entry["expires_at"]
+            for entry in self.active(now).values()
+            if isinstance(entry.get("expires_at"), (int, float))
+        ]
+        return min(expiries) if expiries else None
+
+    @staticmethod
+    def _expired(entry: Dict[str, Any], now: float) -> bool:
+        expires_at = entry.get("expires_at")
+        return isinstance(expires_at, (int, float)) and expires_at <= now
+
+
+# ---------------------------------------------------------------------
+# Metrics export
+# ---------------------------------------------------------------------
+def render_metrics(active: Dict[str, Dict[str, Any]]) -> str:
+    lines = [
+        "# HELP alert_suppression_enabled Whether alert suppression is enabled for a runner (1=enabled, 0=disabled)",
+        "# TYPE alert_suppression_enabled gauge",
+    ]
+    targets = sorted(set(DEFAULT_TARGETS) | set(active))
+    for name in targets:
+        lines.append(f'alert_suppression_enabled{{runner="{name}"}} {1 if name in active else 0}')
+    lines.append(
+        "# HELP alert_suppression_expires_timestamp_seconds UNIX timestamp at which a suppression window expires"
+    )
+    lines.append("# TYPE alert_suppression_expires_timestamp_seconds gauge")
+    for name in sorted(active):
+        expires_at = active[name].get("expires_at")
+        if isinstance(expires_at, (int, float)):
+            lines.append(f'alert_suppression_expires_timestamp_seconds{{runner="{name}"}} {int(expires_at)}')
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(store: SuppressionStore, textfile_dir: Path) -> bool:
+    """Write the textfile only when its content changes; return True if written."""
+    output = textfile_dir / METRICS_NAME
+    content = render_metrics(store.active())
+    try:
+        if output.exists() and output.read_text() == content:
+            return False
+        textfile_dir.mkdir(parents=True, exist_ok=True)
+        tmp = output.with_name(output.name + ".tmp")
+        tmp.write_text(content)
+        os.replace(tmp, output)
+    except OSError as exc:
+        log_warn(f"Unable to write {output} ({exc}); the exporter will pick up the change")
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------
+def selected_domains(args: argparse.Namespace) -> List[str]:
+    domains = list(dict.fromkeys(args.domains))
+    if getattr(args, "runners_only", False):
+        domains = [d for d in domains if is_runner(d)]
+    return domains
+
+
+def cmd_suppress(args: argparse.Namespace) -> int:
+    domains = selected_domains(args)
+    if not domains:
+        return 0
+    store = SuppressionStore(args.dir)
+    with store.transaction():
+        added = store.suppress(domains, args.reason, args.ttl, time.time(), keep_existing=args.keep_existing)
+    export_metrics(store, args.textfile_dir)
+    skipped = [d for d in domains if d not in added]
+    if skipped:
+        log_info(f"Keeping existing suppression for {', '.join(skipped)}")
+    if added:
+        suffix = f" until {format_timestamp(time.time() + args.ttl)}" if args.ttl else ""
+        log_info(f"Alert suppression enabled for {', '.join(added)}{suffix}")
+    return 0
+
+
+def cmd_release(args: argparse.Namespace) -> int:
+    domains = selected_domains(args)
+    store = SuppressionStore(args.dir)
+    with store.transaction():
+        released = store.release(list(store.entries) if args.all else domains, reason=args.reason)
+    export_metrics(store, args.textfile_dir)
+    if released:
+        log_info(f"Alert suppression disabled for {', '.join(released)}")
+    return 0
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    active = SuppressionStore(args.dir).load().active()
+    if args.json:
+        print(json.dumps(active, indent=2, sort_keys=True))
+        return 0
+    if not active:
+        log_info("No active suppressions")
+        return 0
+    for name, entry in sorted(active.items()):
+        print(f"  {name:<40} expires={format_timestamp(entry.get('expires_at')):<22} reason={entry.get('reason', '')}")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    store = SuppressionStore(args.dir)
+    if not args.watch:
+        export_metrics(store.load(), args.textfile_dir)
+        return 0
+    last_mtime: Optional[float] = None
+    next_expiry: Optional[float] = None
+    log_info(f"Exporting {store.path} to {args.textfile_dir / METRICS_NAME} every {args.interval:.0f}s")
+    try:
+        while True:
+            try:
+                mtime: Optional[float] = store.path.stat().st_mtime
+            except FileNotFoundError:
+                mtime = None
+            now = time.time()
+            if last_mtime is None or mtime != last_mtime or (next_expiry is not None and now >= next_expiry):
+                store.load()
+                export_metrics(store, args.textfile_dir)
+                next_expiry = store.next_expiry(now)
+                last_mtime = mtime if mtime is not None else -1.0
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        log_info("Stopping suppression exporter")
+    return 0
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    """Import legacy <domain>.down marker files into the store and remove them."""
+    markers = sorted(args.dir.glob("*.down"))
+    if not markers:
+        log_info("No legacy .down markers found")
+        return 0
+    store = SuppressionStore(args.dir)
+    with store.transaction():
+        for marker in markers:
+            store.suppress([marker.stem], "migrated from .down marker", None, marker.stat().st_mtime)
+    for marker in markers:
+        marker.unlink(missing_ok=True)
+    export_metrics(store, args.textfile_dir)
+    log_info(f"Migrated {len(markers)} marker(s): {', '.join(m.stem for m in markers)}")
+    return 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Alert suppression store")
+    parser.add_argument("--dir", type=Path, default=SUPPRESSION_DIR, help="Directory holding suppressions.json")
+    parser.add_argument("--textfile-dir", type=Path, default=TEXTFILE_DIR, help="node-exporter textfile directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    suppress = sub.add_parser("suppress", help="Suppress alerts for one or more domains")
+    suppress.add_argument("domains", nargs="+")
+    suppress.add_argument("--reason", default="manual", help="Why alerts are suppressed")
+    suppress.add_argument("--ttl", type=parse_duration, help="Expire automatically after e.g. 30m, 2h")
+    suppress.add_argument("--runners-only", action="store_true", help="Ignore domains that are not runners")
+    suppress.add_argument("--keep-existing", action="store_true", help="Leave active suppressions untouched")
+
+    release = sub.add_parser("release", help="Remove suppression for one or more domains")
+    release.add_argument("domains", nargs="*")
+    release.add_argument("--all", action="store_true", help="Release every suppression")
+    release.add_argument("--runners-only", action="store_true", help="Ignore domains that are not runners")
+    release.add_argument("--reason", help="Only release suppressions created with this reason")
+
+    listing = sub.add_parser("list", help="Show active suppressions")
+    listing.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+
+    export = sub.add_parser("export", help="Write alert_suppression.prom")
+    export.add_argument("--watch", action="store_true", help="Keep running; re-export on change or expiry")
+    export.add_argument("--interval", type=float, default=30.0, help="Seconds between store checks in --watch mode")
+
+    sub.add_parser("migrate", help="Import legacy .down marker files")
+
+    return parser.parse_args(argv)
+
+
+COMMANDS = {
+    "suppress": cmd_suppress,
+    "release": cmd_release,
+    "list": cmd_list,
+    "export": cmd_export,
+    "migrate": cmd_migrate,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    try:
+        return COMMANDS[args.command](args)
+    except PermissionError as exc:
+        log_warn(f"{exc}; re-run with sufficient privileges")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Span tracing and profiling shared by the render, metadata and watchdog CLIs.
+
+Enable with `--profile` (or PIFORGE_TRACE=1) to record nested span timings,
+print a per-span summary on exit and write a Chrome trace-event file under
+config-registry/state/traces/ (open it in chrome://tracing or Perfetto).
+`--cprofile` (or PIFORGE_TRACE=cprofile) also dumps pstats next to the trace.
+
+When tracing is off, `span()` returns a shared no-op context manager and
+subprocess is left untouched, so instrumented code pays one function call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+TRACE_DIR = ROOT / "config-registry" / "state" / "traces"
+MAX_EVENTS = 200_000  # the watchdog runs for days; keep the newest events only
+SUMMARY_ROWS = 20
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start", "children")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.children = 0
+
+    def __enter__(self) -> "_Span":
+        self.tracer.stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: object, *exc: object) -> None:
+        duration = time.perf_counter_ns() - self.start
+        stack = self.tracer.stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += duration
+        if exc_type is not None:
+            self.args["error"] = getattr(exc_type, "__name__", str(exc_type))
+        self.tracer.record(self, duration)
+
+
+class Tracer:
+    def __init__(self, tool: str, trace_dir: Path, cprofile: bool) -> None:
+        self.tool = tool
+        self.trace_dir = trace_dir
+        self.origin = time.perf_counter_ns()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=MAX_EVENTS)
+        self.totals: Dict[str, List[int]] = {}  # name -> [count, total ns, self ns, max ns]
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.profiler = None
+        if cprofile:
+            import cProfile
+
+            self.profiler = cProfile.Profile()  # main thread only
+
+    def stack(self) -> List[_Span]:
+        try:
+            return self.local.stack
+        except AttributeError:
+            self.local.stack = []
+            return self.local.stack
+
+    def record(self, span: _Span, duration: int) -> None:
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "ts": (span.start - self.origin) / 1000,
+            "dur": duration / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if span.args:
+            event["args"] = {k: v if isinstance(v, (int, float, bool)) else str(v) for k, v in span.args.items()}
+        with self.lock:
+            self.events.append(event)
+            entry = self.totals.setdefault(span.name, [0, 0, 0, 0])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] += duration - span.children
+            entry[3] = max(entry[3], duration)
+
+    def summary(self) -> List[str]:
+        rows = sorted(self.totals.items(), key=lambda item: item[1][2], reverse=True)
+        lines = [f"{'span':<32} {'calls':>7} {'total ms':>10} {'self ms':>10} {'max ms':>9}"]
+        for name, (count, total, own, longest) in rows[:SUMMARY_ROWS]:
+            lines.append(f"{name:<32} {count:>7} {total / 1e6:>10.1f} {own / 1e6:>10.1f} {longest / 1e6:>9.1f}")
+        if len(rows) > SUMMARY_ROWS:
+            lines.append(f"... {len(rows) - SUMMARY_ROWS} more span(s) in the trace file")
+        return lines
+
+    def finish(self) -> None:
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall = (time.perf_counter_ns() - self.origin) / 1e6
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        base = self.trace_dir / f"{self.tool}-{stamp}-{os.getpid()}"
+        for line in self.summary():
+            print(f"[trace] {line}", file=sys.stderr)
+        try:
+            self.trace_dir.mkdir(parents=True, exist_ok=True)
+            trace_file = base.with_suffix(".trace.json")
+            with self.lock:
+                events = list(self.events)
+            trace_file.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+            print(f"[trace] {self.tool}: {wall:.1f} ms wall; Chrome trace {trace_file}", file=sys.stderr)
+            if self.profiler is not None:
+                import pstats
+
+                stats_file = base.with_suffix(".pstats")
+                self.profiler.dump_stats(str(stats_file))
+                print(f"[trace] cProfile stats {stats_file} (python3 -m pstats {stats_file.name})", file=sys.stderr)
+                pstats.Stats(self.profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(SUMMARY_ROWS)
+        except OSError as exc:
+            print(f"[trace][warn] Unable to write trace under {self.trace_dir} ({exc})", file=sys.stderr)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, **args: Any) -> Any:
+    """Context manager timing a named region; a no-op unless tracing is enabled."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, args)
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def _trace_subprocess() -> None:
+    # check_output/check_call go through subprocess.run, so this covers them too
+    original = subprocess.run
+
+    def run(args: Any, *posargs: Any, **kwargs: Any) -> Any:
+        command = args if isinstance(args, str) else " ".join(str(a) for a in args)
+        with span("subprocess", cmd=command[:200]):
+            return original(args, *posargs, **kwargs)
+
+    subprocess.run = run  # type: ignore[assignment]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record span timings and write a Chrome trace (same as PIFORGE_TRACE=1)",
+    )
+    parser.add_argument("--cprofile", action="store_true", help="With --profile, also dump cProfile stats")
+
+
+def configure(tool: str, args: argparse.Namespace | None = None) -> bool:
+    """Enable tracing from CLI flags or PIFORGE_TRACE; returns whether it is on."""
+    global _tracer
+    setting = os.environ.get("PIFORGE_TRACE", "").strip().lower()
+    cprofile = bool(getattr(args, "cprofile", False)) or setting == "cprofile"
+    wanted = bool(getattr(args, "profile", False)) or cprofile or setting not in ("", "0", "false", "no")
+    if not wanted or _tracer is not None:
+        return _tracer is not None
+    trace_dir = Path(os.environ.get("PIFORGE_TRACE_DIR") or TRACE_DIR)
+    _tracer = Tracer(tool, trace_dir, cprofile)
+    _trace_subprocess()
+    atexit.register(_tracer.finish)
+    if _tracer.profiler is not None:
+        _tracer.profiler.enable()
+    return True
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Pi Telemetry Daemon
+
+Collects Raspberry Pi hardware metrics (thermal zones, hwmon sensors, throttling
+state, kernel error messages) and writes them to node-exporter's textfile
+directory in a single atomic write per interval.
+
+Replaces the per-run forks of the former pi-telemetry.sh, pi-health-exporter.sh and
+pi-dmesg-exporter.sh: sysfs is read directly and /dev/kmsg is tailed
+incrementally from the last sequence number persisted in the state file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------
+DEFAULT_TEXTFILE_DIR = Path(
+    os.environ.get("NODE_EXPORTER_TEXTFILE_DIR", "/srv/monitoring/node-exporter/textfile")
+)
+DEFAULT_STATE_FILE = Path("/var/lib/pi-telemetry/state.json")
+OUTPUT_NAME = "pi_telemetry.prom"
+
+THROTTLE_FLAGS: Tuple[Tuple[str, int], ...] = (
+    ("undervoltage_now", 0x1),
+    ("frequency_capped_now", 0x2),
+    ("throttled_now", 0x4),
+    ("soft_temp_limit_now", 0x8),
+    ("undervoltage_occurred", 0x10000),
+    ("frequency_capped_occurred", 0x20000),
+    ("throttled_occurred", 0x40000),
+    ("soft_temp_limit_occurred", 0x80000),
+)
+
+# sysfs locations of the firmware throttled register, relative to the sysfs root
+THROTTLED_SYSFS = (
+    "devices/platform/soc/soc:firmware/get_throttled",
+    "devices/platform/soc:firmware/get_throttled",
+)
+
+VCGENCMD_CANDIDATES = ("/usr/bin/vcgencmd", "/opt/vc/bin/vcgencmd", "/usr/local/bin/vcgencmd")
+
+# kmsg priorities err(3), crit(2), alert(1), emerg(0)
+KMSG_ERROR_LEVEL = 3
+KMSG_READ_SIZE = 8192
+
+_VOLT = re.compile(r"volt=([0-9]+\.[0-9]+)V")
+_THROTTLED = re.compile(r"0[xX]([0-9a-fA-F]+)")
+
+
+def log_info(message: str) -> None:
+    print(f"[telemetry] {message}")
+
+
+def log_warn(message: str) -> None:
+    print(f"[telemetry][warn] {message}", file=sys.stderr)
+
+
+# ---------------------------------------------------------------------
+# sysfs readers
+# ---------------------------------------------------------------------
+def read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def read_millidegrees(path: Path) -> Optional[float]:
+    raw = read_text(path)
+    if raw is None:
+        return None
+    try:
+        return int(raw) / 1000
+    except ValueError:
+        return None
+
+
+def read_thermal_zones(sys_root: Path) -> List[Tuple[str, str, float]]:
+    """Return (zone, type, celsius) for every readable thermal zone."""
+    zones: List[Tuple[str, str, float]] = []
+    for zone_dir in sorted((sys_root / "class" / "thermal").glob("thermal_zone*")):
+        value = read_millidegrees(zone_dir / "temp")
+        if value is None:
+            continue
+        zone_type = read_text(zone_dir / "type") or "unknown"
+        zones.append((zone_dir.name, zone_type, value))
+    return zones
+
+
+def read_hwmon(sys_root: Path) -> Tuple[List[Tuple[str, str, float]], List[Tuple[str, str, int]]]:
+    """Return hwmon temperatures (chip, sensor, celsius) and alarms (chip, sensor, value)."""
+    temps: List[Tuple[str, str, float]] = []
+    alarms: List[Tuple[str, str, int]] = []
+    for hwmon_dir in sorted((sys_root / "class" / "hwmon").glob("hwmon*")):
+        chip = read_text(hwmon_dir / "name") or hwmon_dir.name
+        for temp_input in sorted(hwmon_dir.glob("temp*_input")):
+            value = read_millidegrees(temp_input)
+            if value is not None:
+                temps.append((chip, temp_input.name[: -len("_input")], value))
+        for alarm in sorted(hwmon_dir.glob("*_alarm")):
+            raw = read_text(alarm)
+            if raw is not None and raw.isdigit():
+                alarms.append((chip, alarm.name[: -len("_alarm")], int(raw)))
+    return temps, alarms
+
+
+def read_throttled_sysfs(sys_root: Path) -> Optional[int]:
+    for relative in THROTTLED_SYSFS:
+        raw = read_text(sys_root / relative)
+        if raw is None:
+            continue
+        try:
+            return int(raw, 16)
+        except ValueError:
+            continue
+    return None
+
+
+# ---------------------------------------------------------------------
+# vcgencmd fallback (one fork per query, only when sysfs has no answer)
+# ---------------------------------------------------------------------
+def find_vcgencmd() -> Optional[str]:
+    found = shutil.which("vcgencmd")
+    if found:
+        return found
+    for candidate in VCGENCMD_CANDIDATES:
+        if os.access(candidate, os.X_OK):
+            return candidate
+    return None
+
+
+def run_vcgencmd(binary: str, *args: str) -> str:
+    try:
+        return subprocess.run(
+            [binary, *args],
+            check=False,
+            text=True,
+            capture_output=True,
+            timeout=5,
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+
+def read_throttled_vcgencmd(binary: str) -> Optional[int]:
+    match = _THROTTLED.search(run_vcgencmd(binary, "get_throttled"))
+    return int(match.group(1), 16) if match else None
+
+
+def read_core_voltage(binary: str) -> Optional[float]:
+    match = _VOLT.search(run_vcgencmd(binary, "measure_volts", "core"))
+    return float(match.group(1)) if match else None
+
+
+# ---------------------------------------------------------------------
+# /dev/kmsg tailing
+# ---------------------------------------------------------------------
+@dataclass
+class KmsgState:
+    boot_id: str = ""
+    last_seq: int = -1
+    error_total: int = 0
+    last_error_timestamp: float = 0.0
+
+    @classmethod
+    def load(cls, path: Path) -> "KmsgState":
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls()
+        if not isinstance(data, dict):
+            return cls()
+        return cls(
+            boot_id=str(data.get("boot_id", "")),
+            last_seq=int(data.get("last_seq", -1)),
+            error_total=int(data.get("error_total", 0)),
+            last_error_timestamp=float(data.get("last_error_timestamp", 0.0)),
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.__dict__))
+        os.replace(tmp, path)
+
+
+def parse_kmsg_record(line: str) -> Optional[Tuple[int, int, int]]:
+    """Parse a kmsg record header into (priority, seq, usec since boot)."""
+    if not line or line.startswith(" "):
+        return None  # continuation line (dictionary key/value)
+    header, _, _ = line.partition(";")
+    fields = header.split(",")
+    if len(fields) < 3:
+        return None
+    try:
+        prefix = int(fields[0])
+        seq = int(fields[1])
+        usec = int(fields[2])
+    except ValueError:
+        return None
+    return prefix & 7, seq, usec
+
+
+@dataclass
+class KmsgTail:
+    """Incrementally read kernel messages, skipping records already counted."""
+
+    path: Path
+    state: KmsgState
+    boot_time: float
+    _fd: Optional[int] = field(default=None, repr=False)
+    _pending: str = field(default="", repr=False)
+
+    def _open(self) -> Optional[int]:
+        if self._fd is None:
+            try:
+                self._fd = os.open(str(self.path), os.O_RDONLY | os.O_NONBLOCK)
+            except OSError as exc:
+                log_warn(f"Unable to open {self.path} ({exc}); kernel error metrics disabled")
+                return None
+        return self._fd
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _read_chunks(self, fd: int) -> Iterable[str]:
+        while True:
+            try:
+                chunk = os.read(fd, KMSG_READ_SIZE)
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                if exc.errno == errno.EPIPE:
+                    continue  # ring buffer overwrote unread records; resume at next
+                if exc.errno == errno.EAGAIN:
+                    return
+                raise
+            if not chunk:
+                return
+            yield chunk.decode("utf-8", errors="replace")
+
+    def poll(self) -> int:
+        """Consume new records; return the number of new error records."""
+        fd = self._open()
+        if fd is None:
+            return 0
+        new_errors = 0
+        for chunk in self._read_chunks(fd):
+            data = self._pending + chunk
+            lines = data.split("\n")
+            self._pending = lines.pop()
+            for line in lines:
+                parsed = parse_kmsg_record(line)
+                if parsed is None:
+                    continue
+                priority, seq, usec = parsed
+                if seq <= self.state.last_seq:
+                    continue
+                self.state.last_seq = seq
+                if priority <= KMSG_ERROR_LEVEL:
+                    new_errors += 1
+                    self.state.error_total += 1
+                    self.state.last_error_timestamp = self.boot_time + usec / 1_000_000
+        return new_errors
+
+
+def read_boot_id(proc_root: Path) -> str:
+    return read_text(proc_root / "sys" / "kernel" / "random" / "boot_id") or ""
+
+
+def boot_time() -> float:
+    clock = getattr(time, "CLOCK_BOOTTIME", time.CLOCK_MONOTONIC)
+    return time.time() - time.clock_gettime(clock)
+
+
+# ---------------------------------------------------------------------
+# Metrics rendering
+# ---------------------------------------------------------------------
+def fmt(value: Optional[float]) -> str:
+    if value is None or value != value:
+        return "NaN"
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.3f}"
+
+
+class MetricWriter:
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+
+    def family(self, name: str, help_text: str, kind: str = "gauge") -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: Optional[float], labels: Optional[Dict[str, str]] = None) -> None:
+        if labels:
+            rendered = ",".join(f'{key}="{escape_label(val)}"' for key, val in labels.items())
+            self.lines.append(f"{name}{{{rendered}}} {fmt(value)}")
+        else:
+            self.lines.append(f"{name} {fmt(value)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@dataclass
+class Sample:
+    timestamp: int
+    thermal: List[Tuple[str, str, float]]
+    hwmon_temps: List[Tuple[str, str, float]]
+    hwmon_alarms: List[Tuple[str, str, int]]
+    throttled: Optional[int]
+    voltage: Optional[float]
+    kmsg: Optional[KmsgState]
+
+
+def render_metrics(sample: Sample) -> str:
+    out = MetricWriter()
+    cpu_temp = sample.thermal[0][2] if sample.thermal else None
+
+    out.family("pi_cpu_temperature_celsius", "Current SoC temperature in Celsius")
+    out.sample("pi_cpu_temperature_celsius", cpu_temp)
+    out.family(
+        "pi_cpu_temperature_last_update_timestamp_seconds",
+        "UNIX timestamp of last temperature sample",
+    )
+    out.sample("pi_cpu_temperature_last_update_timestamp_seconds", sample.timestamp)
+
+    out.family("pi_thermal_zone_temperature_celsius", "Temperature of each sysfs thermal zone in Celsius")
+    for zone, zone_type, value in sample.thermal:
+        out.sample("pi_thermal_zone_temperature_celsius", value, {"zone": zone, "type": zone_type})
+
+    out.family("pi_hwmon_temperature_celsius", "Temperature reported by hwmon sensors in Celsius")
+    for chip, sensor, value in sample.hwmon_temps:
+        out.sample("pi_hwmon_temperature_celsius", value, {"chip": chip, "sensor": sensor})
+
+    out.family("pi_hwmon_alarm", "hwmon alarm state (1 indicates active, e.g. rpi_volt undervoltage)")
+    for chip, sensor, value in sample.hwmon_alarms:
+        out.sample("pi_hwmon_alarm", value, {"chip": chip, "sensor": sensor})
+
+    out.family("pi_core_voltage_volts", "Core voltage reported by vcgencmd")
+    out.sample("pi_core_voltage_volts", sample.voltage)
+    out.family(
+        "pi_core_voltage_last_update_timestamp_seconds",
+        "UNIX timestamp of last voltage sample",
+    )
+    out.sample("pi_core_voltage_last_update_timestamp_seconds", sample.timestamp)
+
+    out.family("pi_throttled_raw", "Raspberry Pi throttled register as integer")
+    out.sample("pi_throttled_raw", sample.throttled)
+    out.family("pi_throttle_flags", "Raspberry Pi throttling & voltage status bits")
+    flag_values: List[Tuple[str, Optional[int]]]
+    if sample.throttled is None:
+        flag_values = [("unknown", None)]
+    else:
+        flag_values = [(name, 1 if sample.throttled & mask else 0) for name, mask in THROTTLE_FLAGS]
+    for name, value in flag_values:
+        out.sample("pi_throttle_flags", value, {"flag": name})
+    out.family("pi_throttled_flag", "Backwards-compatible throttling status metric (deprecated)")
+    for name, value in flag_values:
+        out.sample("pi_throttled_flag", value, {"condition": name})
+    out.family(
+        "pi_throttle_last_update_timestamp_seconds",
+        "UNIX timestamp of last throttle status sample",
+    )
+    out.sample("pi_throttle_last_update_timestamp_seconds", sample.timestamp)
+
+    if sample.kmsg is not None:
+        out.family("pi_dmesg_error_total", "Count of kernel error messages observed via /dev/kmsg", "counter")
+        out.sample("pi_dmesg_error_total", sample.kmsg.error_total)
+        out.family(
+            "pi_dmesg_last_error_timestamp_seconds",
+            "Timestamp of the latest kernel error message",
+        )
+        out.sample("pi_dmesg_last_error_timestamp_seconds", int(sample.kmsg.last_error_timestamp))
+
+    return out.text()
+
+
+def write_atomic(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(content)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------
+# Collector
+# ---------------------------------------------------------------------
+class Collector:
+    def __init__(
+        self,
+        sys_root: Path,
+        proc_root: Path,
+        kmsg_path: Optional[Path],
+        state_file: Path,
+        vcgencmd: Optional[str],
+    ) -> None:
+        self.sys_root = sys_root
+        self.state_file = state_file
+        self.vcgencmd = vcgencmd
+        self.kmsg: Optional[KmsgTail] = None
+        if kmsg_path is not None:
+            state = KmsgState.load(state_file)
+            boot_id = read_boot_id(proc_root)
+            if boot_id and state.boot_id != boot_id:
+                # sequence numbers restart after a reboot; keep the counter monotonic
+                state.boot_id = boot_id
+                state.last_seq = -1
+            self.kmsg = KmsgTail(kmsg_path, state, boot_time())
+
+    def collect(self) -> Sample:
+        throttled = read_throttled_sysfs(self.sys_root)
+        voltage = None
+        if self.vcgencmd:
+            if throttled is None:
+                throttled = read_throttled_vcgencmd(self.vcgencmd)
+            voltage = read_core_voltage(self.vcgencmd)
+        hwmon_temps, hwmon_alarms = read_hwmon(self.sys_root)
+        kmsg_state = None
+        if self.kmsg is not None:
+            kmsg_state = self.kmsg.state
+            last_seq = kmsg_state.last_seq
+            self.kmsg.poll()
+            if kmsg_state.last_seq != last_seq:
+                kmsg_state.save(self.state_file)
+        return Sample(
+            timestamp=int(time.time()),
+            thermal=read_thermal_zones(self.sys_root),
+            hwmon_temps=hwmon_temps,
+            hwmon_alarms=hwmon_alarms,
+            throttled=throttled,
+            voltage=voltage,
+            kmsg=kmsg_state,
+        )
+
+    def close(self) -> None:
+        if self.kmsg is not None:
+            self.kmsg.close()
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Raspberry Pi telemetry textfile exporter")
+    parser.add_argument("--once", action="store_true", help="Collect one sample and exit")
+    parser.add_argument("--interval", type=float, default=15.0, help="Seconds between samples")
+    parser.add_argument("--textfile-dir", type=Path, default=DEFAULT_TEXTFILE_DIR, help="node-exporter textfile directory")
+    parser.add_argument("--state-file", type=Path, default=DEFAULT_STATE_FILE, help="Persisted kmsg offset and counters")
+    parser.add_argument("--sys-root", type=Path, default=Path("/sys"), help="sysfs root (fixture trees in tests)")
+    parser.add_argument("--proc-root", type=Path, default=Path("/proc"), help="procfs root")
+    parser.add_argument("--kmsg", type=Path, default=Path("/dev/kmsg"), help="Kernel message device or fixture file")
+    parser.add_argument("--no-kmsg", action="store_true", help="Disable kernel error metrics")
+    parser.add_argument("--no-vcgencmd", action="store_true", help="Never fork vcgencmd (sysfs only)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+
+    def handle_exit(sig, frame):  # noqa: ARG001
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, handle_exit)
+
+    vcgencmd = None if args.no_vcgencmd else find_vcgencmd()
+    collector = Collector(
+        sys_root=args.sys_root,
+        proc_root=args.proc_root,
+        kmsg_path=None if args.no_kmsg else args.kmsg,
+        state_file=args.state_file,
+        vcgencmd=vcgencmd,
+    )
+    output = args.textfile_dir / OUTPUT_NAME
+    interval = max(1.0, args.interval)
+    if not args.once:
+        log_info(f"Writing {output} every {interval:.0f}s (vcgencmd={vcgencmd or 'none'})")
+    try:
+        while True:
+            started = time.monotonic()
+            write_atomic(output, render_metrics(collector.collect()))
+            if args.once:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        log_info("Stopping pi telemetry")
+    finally:
+        collector.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,91 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Run common/backup.py against scripts/test/fake-restic and a fixture backup.yml:
+# path groups and streamed dumps land in the repository, a failing dump has its
+# (truncated) snapshot forgotten, and a dump that floods stderr does not stall.
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+PYTHON="${PYTHON:-python3}"
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "${WORK_DIR}"' EXIT
+
+export RESTIC_REPOSITORY="${WORK_DIR}/repo"
+export FAKE_RESTIC_LOG="${WORK_DIR}/restic.log"
+
+failures=0
+check() {
+  local description="$1"
+  shift
+  if "$@"; then
+    echo "  ok   ${description}"
+  else
+    echo "  FAIL ${description}"
+    failures=$((failures + 1))
+  fi
+}
+
+task() {
+  "${PYTHON}" -c 'import json,sys; t=json.load(open(sys.argv[1]))["tasks"][sys.argv[2]]; print(t[sys.argv[3]])' \
+    "${WORK_DIR}/timings.json" "$1" "$2"
+}
+
+backup() {
+  # a deadlocked pipe shows up as a timeout instead of a hung check
+  timeout 60 "${PYTHON}" "${ROOT_DIR}/common/backup.py" --no-sudo --config "${WORK_DIR}/backup.yml" \
+    --password-file "${WORK_DIR}/restic.password" --restic "${ROOT_DIR}/scripts/test/fake-restic" \
+    --host fixture --mode manual --dump-timeout 30 --timings-json "${WORK_DIR}/timings.json" "$@"
+}
+
+mkdir -p "${WORK_DIR}/src/app/conf"
+echo "setting=1" > "${WORK_DIR}/src/app/conf/app.ini"
+echo "fixture" > "${WORK_DIR}/restic.password"
+
+cat > "${WORK_DIR}/backup.yml" <<EOF
+backups:
+  ok:
+    databases:
+      - name: appdb
+        command: "sh -c 'yes row | head -c 200000'"
+    groups:
+      app: [${WORK_DIR}/src/app]
+  failing:
+    databases:
+      - name: brokendb
+        command: "sh -c 'yes row | head -c 50000; echo connection lost >&2; exit 3'"
+  noisy:
+    databases:
+      - name: noisydb
+        command: "sh -c 'head -c 2000000 /dev/zero | tr \"\\\\000\" w >&2; yes row | head -c 1000'"
+EOF
+
+echo "=== groups and streamed dumps ==="
+rc=0
+backup --profile ok > "${WORK_DIR}/ok.log" 2>&1 || rc=$?
+check "backup exits 0" test "${rc}" = 0
+appdb="$(task db:appdb snapshot)"
+check "dump streamed in full" test "$(stat -c %s "${RESTIC_REPOSITORY}/snapshots/${appdb}/data/appdb.dump")" = 200000
+check "group snapshot tagged group:app" grep -q -- "--tag group:app" "${FAKE_RESTIC_LOG}"
+
+echo "=== failing dump ==="
+rc=0
+backup --profile failing > "${WORK_DIR}/failing.log" 2>&1 || rc=$?
+check "backup exits 1" test "${rc}" = 1
+broken="$(task db:brokendb snapshot)"
+check "restic still produced a snapshot of the partial dump" test -n "${broken}"
+check "that snapshot is forgotten" grep -qx "forget ${broken}" "${FAKE_RESTIC_LOG}"
+check "and gone from the repository" test ! -e "${RESTIC_REPOSITORY}/snapshots/${broken}"
+check "pg_dump stderr is reported" grep -q "pg_dump failed (3): connection lost" "${WORK_DIR}/failing.log"
+check "earlier snapshots are kept" test -d "${RESTIC_REPOSITORY}/snapshots/${appdb}"
+
+echo "=== dump with 2 MB of stderr ==="
+rc=0
+backup --profile noisy > "${WORK_DIR}/noisy.log" 2>&1 || rc=$?
+check "backup completes without stalling (rc=${rc})" test "${rc}" = 0
+check "dump stored" test "$(task db:noisydb ok)" = True
+
+if [[ "${failures}" -gt 0 ]]; then
+  echo "${failures} check(s) failed" >&2
+  exit 1
+fi
+echo "All backup fixture checks passed"
@@ -0,0 +1,93 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Run scripts/host/pi_telemetry.py --once against fixture sysfs/procfs trees and
+# a kmsg file: sysfs parsing, kmsg de-duplication across runs, and the sequence
+# reset when boot_id changes (the error counter has to stay monotonic).
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+PYTHON="${PYTHON:-python3}"
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "${WORK_DIR}"' EXIT
+
+SYS_ROOT="${WORK_DIR}/sys"
+PROC_ROOT="${WORK_DIR}/proc"
+KMSG="${WORK_DIR}/kmsg"
+STATE="${WORK_DIR}/state.json"
+OUT="${WORK_DIR}/textfile/pi_telemetry.prom"
+
+failures=0
+check() {
+  local description="$1"
+  shift
+  if "$@"; then
+    echo "  ok   ${description}"
+  else
+    echo "  FAIL ${description}"
+    failures=$((failures + 1))
+  fi
+}
+
+metric() {
+  awk -v name="$1" '$1 == name { print $2 }' "${OUT}"
+}
+
+state() {
+  "${PYTHON}" -c 'import json,sys; print(json.load(open(sys.argv[1]))[sys.argv[2]])' "${STATE}" "$1"
+}
+
+collect() {
+  "${PYTHON}" "${ROOT_DIR}/scripts/host/pi_telemetry.py" --once --no-vcgencmd \
+    --sys-root "${SYS_ROOT}" --proc-root "${PROC_ROOT}" --kmsg "${KMSG}" \
+    --state-file "${STATE}" --textfile-dir "${WORK_DIR}/textfile"
+}
+
+mkdir -p "${SYS_ROOT}/class/thermal/thermal_zone0" "${SYS_ROOT}/class/hwmon/hwmon0" \
+  "${SYS_ROOT}/devices/platform/soc/soc:firmware" "${PROC_ROOT}/sys/kernel/random"
+echo 48312 > "${SYS_ROOT}/class/thermal/thermal_zone0/temp"
+echo cpu-thermal > "${SYS_ROOT}/class/thermal/thermal_zone0/type"
+echo rpi_volt > "${SYS_ROOT}/class/hwmon/hwmon0/name"
+echo 1 > "${SYS_ROOT}/class/hwmon/hwmon0/in0_lcrit_alarm"
+echo 50005 > "${SYS_ROOT}/devices/platform/soc/soc:firmware/get_throttled"
+echo boot-a > "${PROC_ROOT}/sys/kernel/random/boot_id"
+
+# priority,seq,usec,flags;message - priorities <= 3 count as errors
+cat > "${KMSG}" <<'EOF'
+6,1,1000000,-;Booting Linux
+3,2,2000000,-;mmc0: timeout waiting for hardware interrupt
+ SUBSYSTEM=mmc
+4,3,3000000,-;Under-voltage detected!
+2,4,4000000,-;EXT4-fs error (device mmcblk0p2)
+EOF
+
+echo "=== first run ==="
+collect
+check "thermal zone in celsius" test "$(metric 'pi_cpu_temperature_celsius')" = "48.312"
+check "throttled register parsed from sysfs hex" test "$(metric 'pi_throttled_raw')" = "327685"
+check "undervoltage flag set" grep -q '^pi_throttle_flags{flag="undervoltage_now"} 1$' "${OUT}"
+check "hwmon alarm exported" grep -q '^pi_hwmon_alarm{chip="rpi_volt",sensor="in0_lcrit"} 1$' "${OUT}"
+check "two error records counted" test "$(metric 'pi_dmesg_error_total')" = "2"
+check "last seq persisted" test "$(state last_seq)" = "4"
+
+echo "=== same boot, one new record ==="
+echo "3,5,5000000,-;usb 1-1: device descriptor read error" >> "${KMSG}"
+collect
+check "records already seen are skipped" test "$(metric 'pi_dmesg_error_total')" = "3"
+check "last seq advanced" test "$(state last_seq)" = "5"
+
+echo "=== reboot (boot_id change, seq restarts) ==="
+echo boot-b > "${PROC_ROOT}/sys/kernel/random/boot_id"
+cat > "${KMSG}" <<'EOF'
+6,1,1000000,-;Booting Linux
+3,2,2000000,-;mmc0: timeout waiting for hardware interrupt
+EOF
+collect
+check "records after reboot are counted despite lower seq" test "$(metric 'pi_dmesg_error_total')" = "4"
+check "boot_id updated" test "$(state boot_id)" = "boot-b"
+check "last seq restarted" test "$(state last_seq)" = "2"
+
+if [[ "${failures}" -gt 0 ]]; then
+  echo "${failures} check(s) failed" >&2
+  exit 1
+fi
+echo "All pi telemetry checks passed"
@@ -0,0 +1,115 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Back up fixture trees with scripts/test/fake-restic, then run common/restore.py
+# into a temporary target that already has content: merge (replace, keep local
+# extras, no staging leftovers), database streams, snapshot selectors, and the
+# rollback of a group whose verification fails.
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+PYTHON="${PYTHON:-python3}"
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "${WORK_DIR}"' EXIT
+
+export RESTIC_REPOSITORY="${WORK_DIR}/repo"
+SRC="${WORK_DIR}/src"
+TARGET="${WORK_DIR}/target"
+APP="${TARGET}${SRC}/app"
+
+failures=0
+check() {
+  local description="$1"
+  shift
+  if "$@"; then
+    echo "  ok   ${description}"
+  else
+    echo "  FAIL ${description}"
+    failures=$((failures + 1))
+  fi
+}
+
+common_args=(--no-sudo --config "${WORK_DIR}/backup.yml" --profile fixture
+  --password-file "${WORK_DIR}/restic.password" --restic "${ROOT_DIR}/scripts/test/fake-restic")
+
+restore() {
+  timeout 60 "${PYTHON}" "${ROOT_DIR}/common/restore.py" "${common_args[@]}" \
+    --index-dir "${WORK_DIR}/index" --refresh "$@"
+}
+
+no_leftovers() {
+  [[ -z "$(find "${TARGET}" -name '.restore-*')" ]]
+}
+
+mkdir -p "${SRC}/app/conf" "${SRC}/app/data" "${SRC}/etc"
+echo "setting=from-snapshot" > "${SRC}/app/conf/app.ini"
+head -c 4096 /dev/zero > "${SRC}/app/data/blob.bin"
+echo "etc" > "${SRC}/etc/hosts"
+echo "fixture" > "${WORK_DIR}/restic.password"
+
+cat > "${WORK_DIR}/backup.yml" <<EOF
+backups:
+  fixture:
+    databases:
+      - name: appdb
+        command: "sh -c 'yes row | head -c 100000'"
+        restore_command: "sh -c 'cat > ${WORK_DIR}/into-container.dump'"
+    groups:
+      app: [${SRC}/app]
+      etc: [${SRC}/etc]
+EOF
+
+timeout 60 "${PYTHON}" "${ROOT_DIR}/common/backup.py" "${common_args[@]}" --host fixture > "${WORK_DIR}/backup.log" 2>&1
+
+# the target already holds an older copy plus a file that is not in the snapshot
+mkdir -p "${APP}/conf"
+echo "setting=old" > "${APP}/conf/app.ini"
+echo "local" > "${APP}/conf/local.ini"
+
+echo "=== selectors ==="
+today="$(date +%Y%m%d)"
+rc=0
+restore "date:${today}" --group app --dry-run > "${WORK_DIR}/date.log" 2>&1 || rc=$?
+check "date:${today} selects today's snapshot" test "${rc}" = 0
+rc=0
+restore "${today}" --dry-run > "${WORK_DIR}/bare-date.log" 2>&1 || rc=$?
+check "a bare date is treated as a snapshot id (rc=${rc})" test "${rc}" = 1
+check "with a hint to use date:" grep -q "use date:${today}" "${WORK_DIR}/bare-date.log"
+restore latest --dry-run > "${WORK_DIR}/plan.log" 2>&1 || true
+# planned even where the vault file does not exist (and so was not backed up)
+check "the config group is always planned" grep -Eq "No snapshot for group 'config'|^  config " "${WORK_DIR}/plan.log"
+
+echo "=== merge into an existing target ==="
+rc=0
+restore latest --group app,etc --database appdb --target "${TARGET}" > "${WORK_DIR}/restore.log" 2>&1 || rc=$?
+check "restore exits 0" test "${rc}" = 0
+check "existing file replaced" grep -qx "setting=from-snapshot" "${APP}/conf/app.ini"
+check "files not in the snapshot are kept" grep -qx "local" "${APP}/conf/local.ini"
+check "new files restored" test "$(stat -c %s "${APP}/data/blob.bin")" = 4096
+check "second group restored" test -f "${TARGET}${SRC}/etc/hosts"
+check "dump written to <target>/db" test "$(stat -c %s "${TARGET}/db/appdb.dump")" = 100000
+check "no staging or aside copies left" no_leftovers
+
+echo "=== restore_command (--into-container) ==="
+rc=0
+restore latest --database appdb --into-container > "${WORK_DIR}/into.log" 2>&1 || rc=$?
+check "restore exits 0" test "${rc}" = 0
+check "dump streamed into restore_command" test "$(stat -c %s "${WORK_DIR}/into-container.dump")" = 100000
+
+echo "=== failed verification rolls the group back ==="
+echo "setting=local-edit" > "${APP}/conf/app.ini"
+rm -rf "${APP}/data"
+rc=0
+FAKE_RESTIC_TRUNCATE="${SRC}/app/conf/app.ini" \
+  restore latest --group app --target "${TARGET}" > "${WORK_DIR}/rollback.log" 2>&1 || rc=$?
+check "restore exits 1" test "${rc}" = 1
+check "rollback reported" grep -q "rolling back" "${WORK_DIR}/rollback.log"
+check "replaced file restored from its aside copy" grep -qx "setting=local-edit" "${APP}/conf/app.ini"
+check "paths added by the group are removed again" test ! -e "${APP}/data"
+check "untouched files kept" grep -qx "local" "${APP}/conf/local.ini"
+check "no staging or aside copies left" no_leftovers
+
+if [[ "${failures}" -gt 0 ]]; then
+  echo "${failures} check(s) failed" >&2
+  exit 1
+fi
+echo "All restore fixture checks passed"
@@ -0,0 +1,128 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Exercise common/status.py against a fake Docker Engine API on a Unix socket:
+# container -> domain mapping, ps/status JSON, dependents, and log demuxing for
+# multiplexed (non-TTY) and raw (TTY) containers.
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+PYTHON="${PYTHON:-python3}"
+WORK_DIR="$(mktemp -d)"
+SOCKET="${WORK_DIR}/docker.sock"
+SERVER_PID=""
+
+cleanup() {
+  [[ -n "${SERVER_PID}" ]] && kill "${SERVER_PID}" 2>/dev/null || true
+  rm -rf "${WORK_DIR}"
+}
+trap cleanup EXIT
+
+failures=0
+check() {
+  local description="$1"
+  shift
+  if "$@"; then
+    echo "  ok   ${description}"
+  else
+    echo "  FAIL ${description}"
+    failures=$((failures + 1))
+  fi
+}
+
+cat > "${WORK_DIR}/fake_docker.py" <<'EOF'
+import json, os, socketserver, struct, sys
+from http.server import BaseHTTPRequestHandler
+
+GENERATED = sys.argv[2]
+CONTAINERS = [
+    {"Id": "a" * 64, "Names": ["/forgejo"], "Image": "forgejo", "State": "running", "Status": "Up 2 hours (healthy)",
+     "Labels": {"com.docker.compose.project": "forgejo", "com.docker.compose.service": "server",
+                "com.docker.compose.project.config_files": f"{GENERATED}/forgejo/compose.yml"},
+     "Ports": [], "NetworkSettings": {"Networks": {}}},
+    {"Id": "b" * 64, "Names": ["/woodpecker"], "Image": "woodpecker", "State": "exited", "Status": "Exited (0)",
+     "Labels": {"com.docker.compose.project": "woodpecker", "com.docker.compose.service": "server",
+                "com.docker.compose.project.config_files": f"{GENERATED}/woodpecker/compose.yml"},
+     "Ports": [], "NetworkSettings": {"Networks": {}}},
+    {"Id": "c" * 64, "Names": ["/forgejo-tty"], "Image": "busybox", "State": "running", "Status": "Up",
+     "Labels": {"com.docker.compose.project": "forgejo", "com.docker.compose.service": "tty",
+                "com.docker.compose.project.config_files": f"{GENERATED}/forgejo/compose.yml"},
+     "Ports": [], "NetworkSettings": {"Networks": {}}},
+]
+TTY = {"c" * 64}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, body, content_type="application/json", status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/containers/json":
+            return self.reply(json.dumps(CONTAINERS).encode())
+        prefix = path.split("/")[2] if path.count("/") >= 3 else ""
+        cid = next((c["Id"] for c in CONTAINERS if prefix and c["Id"].startswith(prefix)), prefix)  # ids may be short
+        if path.endswith("/json"):
+            return self.reply(json.dumps({"Id": cid, "Config": {"Tty": cid in TTY}}).encode())
+        if path.endswith("/logs"):
+            if cid in TTY:
+                # raw output that happens to start with a valid stream-type byte
+                body = b"\x01tty raw line\nsecond tty line\n"
+            else:
+                body = b"".join(struct.pack(">BxxxL", s, len(t)) + t for s, t in ((1, b"out line\npart"), (2, b"ial\n")))
+            # old daemons report raw-stream for both kinds, so the client has to ask
+            return self.reply(body, "application/vnd.docker.raw-stream")
+        self.reply(b'{"message":"not found"}', status=404)
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+Server(sys.argv[1], Handler).serve_forever()
+EOF
+
+"${PYTHON}" "${WORK_DIR}/fake_docker.py" "${SOCKET}" "${ROOT_DIR}/generated" &
+SERVER_PID=$!
+for _ in $(seq 50); do [[ -S "${SOCKET}" ]] && break; sleep 0.1; done
+
+status() {
+  "${PYTHON}" "${ROOT_DIR}/common/status.py" --socket "${SOCKET}" "$@"
+}
+
+echo "=== ps / status ==="
+ps_json="$(status ps forgejo --json)"
+check "ps maps both compose containers to forgejo" \
+  "${PYTHON}" -c 'import json,sys; d=json.loads(sys.argv[1]); assert d["containers"] == 2 and d["running"] == 2, d' "${ps_json}"
+status_json="$(status status forgejo woodpecker --json)"
+check "status reports woodpecker down" \
+  "${PYTHON}" -c 'import json,sys; d=json.loads(sys.argv[1])["domains"]; assert d["woodpecker"]["state"] == "down", d' "${status_json}"
+
+echo "=== dependents ==="
+declared="$(status dependents postgres)"
+running="$(status dependents postgres --running)"
+check "every declared dependent blocks by default (got '${declared}')" test "${declared}" = "forgejo woodpecker"
+check "--running keeps only running dependents (got '${running}')" test "${running}" = "forgejo"
+offline="$(DOCKER_HOST="unix://${WORK_DIR}/missing.sock" "${PYTHON}" "${ROOT_DIR}/common/status.py" dependents postgres --running 2>/dev/null)"
+check "unreachable API treats every dependent as running" test "${offline}" = "forgejo woodpecker"
+
+echo "=== logs ==="
+logs="$(status logs forgejo --tail 10)"
+check "multiplexed frames are joined into lines" grep -q "server | out line" <<<"${logs}"
+check "frames split mid-line are reassembled" grep -q "server | partial" <<<"${logs}"
+check "TTY output starting with 0x01 is not parsed as a frame" grep -q $'tty    | \x01tty raw line' <<<"${logs}"
+check "TTY output keeps every line" grep -q "tty    | second tty line" <<<"${logs}"
+
+if [[ "${failures}" -gt 0 ]]; then
+  echo "${failures} check(s) failed" >&2
+  exit 1
+fi
+echo "All status API checks passed"
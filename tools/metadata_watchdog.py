@@ -28,6 +28,10 @@ except ImportError:  # pragma: no cover (Windows or constrained systems)
 # Configuration
 # ---------------------------------------------------------------------
 ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "common"))
+
+from tracing import add_arguments as add_profile_arguments, configure as configure_tracing, span  # noqa: E402
+
 WATCH_DIR = ROOT_DIR / "config-registry/state/metadata-cache"
 LOCK_FILE = ROOT_DIR / "config-registry/state/.lock"
 METADATA_SCRIPT = ROOT_DIR / "common/lib/metadata.sh"
@@ -64,6 +68,11 @@ def metadata_lock(non_blocking: bool = True):
 # ---------------------------------------------------------------------
 def run_metadata_diff(auto_diff: bool) -> None:
     """Run metadata diff and optionally trigger make diff-metadata."""
+    with span("metadata_diff", auto_diff=auto_diff):
+        _run_metadata_diff(auto_diff)
+
+
+def _run_metadata_diff(auto_diff: bool) -> None:
     try:
         with metadata_lock():
             proc = subprocess.run(
@@ -178,6 +187,7 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     parser.add_argument("--once", action="store_true", help="Run one diff/check and exit")
     parser.add_argument("--debounce", type=float, default=1.0, help="Debounce interval for watchdog")
     parser.add_argument("--interval", type=float, default=3.0, help="Polling interval if watchdog not installed")
+    add_profile_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -186,6 +196,7 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
 # ---------------------------------------------------------------------
 def main(argv: list[str]) -> int:
     args = parse_args(argv)
+    configure_tracing("metadata-watchdog", args)
 
     def handle_exit(sig, frame):  # noqa: ARG001
         raise KeyboardInterrupt
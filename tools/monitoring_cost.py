@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Monitoring Cost Report
+
+Reads the rendered monitoring configs (prometheus.yml, config.alloy, rule files)
+and estimates what they cost Prometheus on the Pi: scrape load per job,
+relabel/drop coverage, and rules that keep high-cardinality labels. A saved
+`/api/v1/series` response can be replayed to turn estimates into series counts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import yaml  # type: ignore[import]
+except ImportError:  # pragma: no cover - dependency hint
+    print("[cost] PyYAML not installed. Install with 'pip install -r requirements/render.txt'", file=sys.stderr)
+    raise
+
+# ---------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------
+ROOT_DIR = Path(__file__).resolve().parents[1]
+GENERATED_DIR = ROOT_DIR / "generated/monitoring"
+
+DEFAULT_SCRAPE_INTERVAL = "1m"  # Prometheus and Alloy default
+# Labels whose value sets grow with containers, mounts, URLs or histogram buckets
+HIGH_CARDINALITY_LABELS = {
+    "id",
+    "container_id",
+    "image",
+    "name",
+    "pod",
+    "path",
+    "url",
+    "handler",
+    "le",
+    "interface",
+    "device",
+    "mountpoint",
+    "cpu",
+}
+# Jobs known to expose thousands of series without metric_relabel_configs
+HEAVY_JOBS = {"cadvisor", "node-exporter"}
+DROP_ACTIONS = {"drop", "keep", "labeldrop", "labelkeep"}
+# Selectors without label matchers are only flagged when they read at least this many series
+UNFILTERED_SERIES_WARN = 100
+
+AGGREGATORS = {
+    "sum", "avg", "min", "max", "count", "group", "stddev", "stdvar",
+    "topk", "bottomk", "quantile", "count_values", "limitk", "limit_ratio",
+}
+KEYWORDS = {
+    "by", "without", "on", "ignoring", "group_left", "group_right", "bool",
+    "and", "or", "unless", "offset", "atan2", "inf", "nan",
+}
+
+_DURATION_PART = re.compile(r"(\d+)(ms|y|w|d|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+_STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`')
+_GROUPING = re.compile(r"\b(by|without)\s*\(([^)]*)\)")
+_MODIFIERS = re.compile(r"\b(on|ignoring|group_left|group_right)\s*\([^)]*\)")
+_RANGE = re.compile(r"\[[^\]]*\]")
+_MATCHER = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(=~|!~|!=|=)\s*"((?:\\.|[^"\\])*)"')
+_IDENT = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+
+
+def log_warn(message: str) -> None:
+    print(f"[cost][warn] {message}", file=sys.stderr)
+
+
+def duration_seconds(value: object) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str) or not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(int(n) * _UNIT_SECONDS[u] for n, u in parts)
+
+
+# ---------------------------------------------------------------------
+# Series fixture
+# ---------------------------------------------------------------------
+class SeriesIndex:
+    """Label sets from a saved /api/v1/series response, indexed by metric name."""
+
+    def __init__(self, series: Iterable[Dict[str, str]]) -> None:
+        self.by_metric: Dict[str, List[Dict[str, str]]] = {}
+        self.total = 0
+        for labels in series:
+            self.by_metric.setdefault(labels.get("__name__", ""), []).append(labels)
+            self.total += 1
+
+    @classmethod
+    def load(cls, path: Path) -> "SeriesIndex":
+        data = json.loads(path.read_text())
+        if isinstance(data, dict):
+            data = data.get("data", [])
+        if not isinstance(data, list):
+            raise ValueError(f"{path}: expected a list of label sets or an /api/v1/series response")
+        return cls(entry for entry in data if isinstance(entry, dict))
+
+    def count_by(self, label: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for series in self.by_metric.values():
+            for labels in series:
+                key = labels.get(label, "")
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def label_cardinality(self) -> Dict[str, int]:
+        values: Dict[str, Set[str]] = {}
+        for series in self.by_metric.values():
+            for labels in series:
+                for key, value in labels.items():
+                    if key != "__name__":
+                        values.setdefault(key, set()).add(value)
+        return {key: len(vals) for key, vals in values.items()}
+
+    def select(self, metric: Optional[str], matchers: Sequence[Tuple[str, str, str]]) -> List[Dict[str, str]]:
+        candidates: Iterable[Dict[str, str]]
+        if metric:
+            candidates = self.by_metric.get(metric, [])
+        else:
+            candidates = (labels for series in self.by_metric.values() for labels in series)
+        return [labels for labels in candidates if all(match(labels, m) for m in matchers)]
+
+
+def match(labels: Dict[str, str], matcher: Tuple[str, str, str]) -> bool:
+    name, op, value = matcher
+    actual = labels.get(name, "")
+    if op == "=":
+        return actual == value
+    if op == "!=":
+        return actual != value
+    try:
+        hit = re.fullmatch(value, actual) is not None
+    except re.error:
+        return True  # unparseable regex: count the series rather than under-estimate
+    return hit if op == "=~" else not hit
+
+
+# ---------------------------------------------------------------------
+# Scrape jobs
+# ---------------------------------------------------------------------
+@dataclass
+class ScrapeJob:
+    name: str
+    source: str
+    interval: float
+    targets: Optional[int]
+    relabel_rules: int = 0
+    metric_relabel_rules: int = 0
+    drops_metrics: bool = False
+    series: Optional[int] = None
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def scrapes_per_minute(self) -> Optional[float]:
+        if self.targets is None:
+            return None
+        return self.targets * 60 / self.interval
+
+    @property
+    def samples_per_second(self) -> Optional[float]:
+        if self.series is None:
+            return None
+        return self.series / self.interval
+
+
+def prometheus_jobs(data: Dict[str, Any]) -> List[ScrapeJob]:
+    global_cfg = data.get("global") or {}
+    default_interval = duration_seconds(global_cfg.get("scrape_interval", DEFAULT_SCRAPE_INTERVAL)) or 60.0
+    jobs: List[ScrapeJob] = []
+    for cfg in data.get("scrape_configs") or []:
+        if not isinstance(cfg, dict):
+            continue
+        targets: Optional[int] = 0
+        for static in cfg.get("static_configs") or []:
+            targets += len((static or {}).get("targets") or [])
+        if any(key.endswith("_sd_configs") for key in cfg):
+            targets = None  # discovered at runtime
+        metric_relabel = cfg.get("metric_relabel_configs") or []
+        jobs.append(
+            ScrapeJob(
+                name=str(cfg.get("job_name", "<unnamed>")),
+                source="prometheus",
+                interval=duration_seconds(cfg.get("scrape_interval")) or default_interval,
+                targets=targets,
+                relabel_rules=len(cfg.get("relabel_configs") or []),
+                metric_relabel_rules=len(metric_relabel),
+                drops_metrics=any(
+                    str((rule or {}).get("action", "replace")).lower() in DROP_ACTIONS for rule in metric_relabel
+                ),
+            )
+        )
+    return jobs
+
+
+def alloy_blocks(text: str, kind: str) -> Dict[str, str]:
+    """Return {label: body} for every `<kind> "<label>" { ... }` block."""
+    text = re.sub(r"//[^\n]*", "", text)
+    blocks: Dict[str, str] = {}
+    for found in re.finditer(rf'{re.escape(kind)}\s+"([^"]+)"\s*\{{', text):
+        depth, index = 1, found.end()
+        while depth and index < len(text):
+            char = text[index]
+            if char == '"':
+                string = _STRING.match(text, index)
+                index = string.end() if string else index + 1
+                continue
+            depth += {"{": 1, "}": -1}.get(char, 0)
+            index += 1
+        blocks[found.group(1)] = text[found.end() : index - 1]
+    return blocks
+
+
+def alloy_jobs(text: str) -> List[ScrapeJob]:
+    relabels = alloy_blocks(text, "prometheus.relabel")
+    jobs: List[ScrapeJob] = []
+    for name, body in alloy_blocks(text, "prometheus.scrape").items():
+        interval = re.search(r'scrape_interval\s*=\s*"([^"]+)"', body)
+        job_name = re.search(r'job_name\s*=\s*"([^"]+)"', body)
+        targets_expr = re.search(r"targets\s*=\s*(\[.*?\]|[^\n]+)", body, re.DOTALL)
+        targets: Optional[int] = None
+        if targets_expr and targets_expr.group(1).startswith("["):
+            targets = targets_expr.group(1).count("__address__")
+        rules = 0
+        drops = False
+        forward = re.search(r"forward_to\s*=\s*\[([^\]]*)\]", body)
+        for ref in re.findall(r"prometheus\.relabel\.([\w-]+)\.receiver", forward.group(1) if forward else ""):
+            relabel_body = relabels.get(ref, "")
+            rules += len(re.findall(r"\brule\s*\{", relabel_body))
+            actions = re.findall(r'action\s*=\s*"([^"]+)"', relabel_body)
+            drops = drops or any(action.lower() in DROP_ACTIONS for action in actions)
+        jobs.append(
+            ScrapeJob(
+                name=job_name.group(1) if job_name else f"prometheus.scrape.{name}",
+                source="alloy",
+                interval=duration_seconds(interval.group(1) if interval else DEFAULT_SCRAPE_INTERVAL) or 60.0,
+                targets=targets,
+                metric_relabel_rules=rules,
+                drops_metrics=drops,
+            )
+        )
+    return jobs
+
+
+# ---------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------
+@dataclass
+class RuleCost:
+    group: str
+    name: str
+    kind: str
+    interval: float
+    selectors: List[str]
+    grouping: Optional[Tuple[str, List[str]]]
+    high_cardinality_labels: List[str]
+    input_series: Optional[int] = None
+    output_series: Optional[int] = None
+    warnings: List[str] = field(default_factory=list)
+
+
+def parse_selectors(expr: str) -> List[Tuple[Optional[str], List[Tuple[str, str, str]]]]:
+    """Extract (metric, matchers) for each vector selector in a PromQL expression."""
+    matchers_by_block: List[str] = []
+
+    def stash(found: re.Match) -> str:
+        matchers_by_block.append(found.group(0))
+        return f" __block{len(matchers_by_block) - 1}__ "
+
+    cleaned = re.sub(r"\{[^}]*\}", stash, expr)
+    cleaned = _STRING.sub(" ", cleaned)
+    cleaned = _GROUPING.sub(" ", cleaned)
+    cleaned = _MODIFIERS.sub(" ", cleaned)
+    cleaned = _RANGE.sub(" ", cleaned)
+
+    selectors: List[Tuple[Optional[str], List[Tuple[str, str, str]]]] = []
+    tokens = list(re.finditer(r"__block(\d+)__|[a-zA-Z_:][a-zA-Z0-9_:]*|\S", cleaned))
+    index = 0
+    while index < len(tokens):
+        token = tokens[index].group(0)
+        block_id = tokens[index].group(1)
+        following = tokens[index + 1].group(0) if index + 1 < len(tokens) else ""
+        if block_id is not None:
+            selectors.append((None, _MATCHER.findall(matchers_by_block[int(block_id)])))
+        elif _IDENT.fullmatch(token) and following != "(" and token.lower() not in KEYWORDS:
+            matchers: List[Tuple[str, str, str]] = []
+            if tokens[index + 1 :] and tokens[index + 1].group(1) is not None:
+                matchers = _MATCHER.findall(matchers_by_block[int(tokens[index + 1].group(1))])
+                index += 1
+            if not re.fullmatch(r"[0-9eE.]+", token):
+                selectors.append((token, matchers))
+        index += 1
+    # {__name__="..."} selectors
+    normalized = []
+    for metric, matchers in selectors:
+        name_matchers = [m for m in matchers if m[0] == "__name__" and m[1] == "="]
+        if metric is None and name_matchers:
+            metric = name_matchers[0][2]
+            matchers = [m for m in matchers if m not in name_matchers]
+        normalized.append((metric, matchers))
+    return normalized
+
+
+def outer_grouping(expr: str) -> Optional[Tuple[str, List[str]]]:
+    """Grouping of the outermost aggregation, or None when the result is not aggregated."""
+    stripped = _STRING.sub('""', expr).strip()
+    head = re.match(r"([a-z_]+)\s*(?:(by|without)\s*\(([^)]*)\))?\s*\(", stripped)
+    if not head or head.group(1) not in AGGREGATORS:
+        return None
+    if head.group(2):
+        return head.group(2), [label.strip() for label in head.group(3).split(",") if label.strip()]
+    # suffix form: sum(...) by (...)
+    depth, index = 0, head.end() - 1
+    while index < len(stripped):
+        depth += {"(": 1, ")": -1}.get(stripped[index], 0)
+        index += 1
+        if depth == 0:
+            break
+    tail = re.match(r"\s*(by|without)\s*\(([^)]*)\)", stripped[index:])
+    if tail:
+        return tail.group(1), [label.strip() for label in tail.group(2).split(",") if label.strip()]
+    return "by", []
+
+
+def rule_costs(data: Dict[str, Any], default_interval: float, series: Optional[SeriesIndex]) -> List[RuleCost]:
+    costs: List[RuleCost] = []
+    for group in data.get("groups") or []:
+        if not isinstance(group, dict):
+            continue
+        interval = duration_seconds(group.get("interval")) or default_interval
+        for rule in group.get("rules") or []:
+            if not isinstance(rule, dict):
+                continue
+            expr = str(rule.get("expr", ""))
+            kind = "record" if rule.get("record") else "alert"
+            selectors = parse_selectors(expr)
+            grouping = outer_grouping(expr)
+            cost = RuleCost(
+                group=str(group.get("name", "")),
+                name=str(rule.get("record") or rule.get("alert") or "<unnamed>"),
+                kind=kind,
+                interval=interval,
+                selectors=[metric or "{...}" for metric, _ in selectors],
+                grouping=grouping,
+                high_cardinality_labels=[],
+            )
+            if grouping and grouping[0] == "by":
+                cost.high_cardinality_labels = sorted(set(grouping[1]) & HIGH_CARDINALITY_LABELS)
+            if series is not None:
+                estimate_rule(cost, selectors, series)
+            flag_rule(cost, selectors, series)
+            costs.append(cost)
+    return costs
+
+
+def estimate_rule(
+    cost: RuleCost,
+    selectors: Sequence[Tuple[Optional[str], List[Tuple[str, str, str]]]],
+    series: SeriesIndex,
+) -> None:
+    selected = [series.select(metric, matchers) for metric, matchers in selectors]
+    cost.input_series = sum(len(rows) for rows in selected)
+    widest = max(selected, key=len, default=[])
+    if cost.grouping is None:
+        cost.output_series = len(widest)
+        kept = {key for labels in widest for key in labels if key != "__name__"}
+    else:
+        mode, labels = cost.grouping
+        if mode == "by":
+            keys = {tuple(row.get(label, "") for label in labels) for row in widest}
+            kept = set(labels)
+        else:
+            excluded = set(labels) | {"__name__"}
+            keys = {tuple(sorted((k, v) for k, v in row.items() if k not in excluded)) for row in widest}
+            kept = {key for row in widest for key in row if key not in excluded}
+        cost.output_series = len(keys) if widest else 0
+    cost.high_cardinality_labels = sorted(kept & HIGH_CARDINALITY_LABELS)
+
+
+def flag_rule(
+    cost: RuleCost,
+    selectors: Sequence[Tuple[Optional[str], List[Tuple[str, str, str]]]],
+    series: Optional[SeriesIndex],
+) -> None:
+    for metric, matchers in selectors:
+        if series is None or not metric or matchers:
+            continue
+        count = len(series.by_metric.get(metric, []))
+        if count >= UNFILTERED_SERIES_WARN:
+            cost.warnings.append(f"unfiltered selector '{metric}' reads all {count} series of the metric")
+    if cost.kind != "record":
+        return
+    if cost.grouping is None:
+        cost.warnings.append("recording rule is not aggregated; output copies every input series")
+    elif cost.grouping[0] == "without":
+        cost.warnings.append(f"aggregates without({', '.join(cost.grouping[1])}); all other labels are kept")
+    if cost.high_cardinality_labels:
+        cost.warnings.append(f"keeps high-cardinality labels: {', '.join(cost.high_cardinality_labels)}")
+
+
+# ---------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------
+@dataclass
+class Report:
+    jobs: List[ScrapeJob]
+    rules: List[RuleCost]
+    total_series: Optional[int] = None
+    label_cardinality: Dict[str, int] = field(default_factory=dict)
+    top_metrics: List[Tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def samples_per_second(self) -> Optional[float]:
+        rates = [job.samples_per_second for job in self.jobs]
+        if any(rate is None for rate in rates):
+            return None
+        return sum(rate for rate in rates if rate is not None)
+
+
+def build_report(
+    prometheus: Optional[Path],
+    alloy: Optional[Path],
+    rules: Sequence[Path],
+    series_file: Optional[Path],
+    top: int = 10,
+) -> Report:
+    series = SeriesIndex.load(series_file) if series_file else None
+    jobs: List[ScrapeJob] = []
+    evaluation_interval = 60.0
+    if prometheus and prometheus.exists():
+        data = yaml.safe_load(prometheus.read_text()) or {}
+        jobs.extend(prometheus_jobs(data))
+        evaluation_interval = duration_seconds((data.get("global") or {}).get("evaluation_interval")) or 60.0
+    elif prometheus:
+        log_warn(f"{prometheus} not found (render the monitoring domain first)")
+    if alloy and alloy.exists():
+        jobs.extend(alloy_jobs(alloy.read_text()))
+
+    rule_list: List[RuleCost] = []
+    for path in rules:
+        if path.exists():
+            rule_list.extend(rule_costs(yaml.safe_load(path.read_text()) or {}, evaluation_interval, series))
+        else:
+            log_warn(f"{path} not found")
+
+    report = Report(jobs=jobs, rules=rule_list)
+    if series is not None:
+        per_job = series.count_by("job")
+        for job in jobs:
+            job.series = per_job.get(job.name, 0)
+        report.total_series = series.total
+        report.label_cardinality = series.label_cardinality()
+        report.top_metrics = sorted(
+            ((name, len(rows)) for name, rows in series.by_metric.items()), key=lambda item: -item[1]
+        )[:top]
+    for job in jobs:
+        if not job.drops_metrics and (job.name in HEAVY_JOBS or (job.series or 0) > 1000):
+            job.warnings.append("no metric_relabel drop/keep rules; every exposed series is stored")
+    return report
+
+
+def fmt(value: Optional[float], digits: int = 1) -> str:
+    if value is None:
+        return "?"
+    return f"{value:.{digits}f}" if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def print_report(report: Report) -> None:
+    print("Scrape jobs")
+    print(f"  {'job':<28} {'source':<10} {'interval':>8} {'targets':>7} {'scr/min':>7} {'relabel':>7} {'metric':>6} {'drop':>4} {'series':>7} {'smp/s':>7}")
+    for job in report.jobs:
+        print(
+            f"  {job.name:<28} {job.source:<10} {fmt(job.interval) + 's':>8} {fmt(job.targets):>7}"
+            f" {fmt(job.scrapes_per_minute):>7} {job.relabel_rules:>7} {job.metric_relabel_rules:>6}"
+            f" {'yes' if job.drops_metrics else 'no':>4} {fmt(job.series):>7} {fmt(job.samples_per_second):>7}"
+        )
+        for warning in job.warnings:
+            print(f"    ! {warning}")
+
+    print("\nRules")
+    for rule in report.rules:
+        grouping = "none" if rule.grouping is None else f"{rule.grouping[0]}({', '.join(rule.grouping[1])})"
+        estimate = ""
+        if rule.input_series is not None:
+            estimate = f" in={rule.input_series} out={rule.output_series}"
+        print(f"  [{rule.kind}] {rule.group}/{rule.name} every {fmt(rule.interval)}s agg={grouping}{estimate}")
+        for warning in rule.warnings:
+            print(f"    ! {warning}")
+
+    if report.total_series is not None:
+        print(f"\nSeries: {report.total_series} total, {fmt(report.samples_per_second)} samples/s ingested")
+        print("  top metrics:")
+        for name, count in report.top_metrics:
+            print(f"    {count:>7}  {name}")
+        print("  high-cardinality labels:")
+        for label, count in sorted(report.label_cardinality.items(), key=lambda item: -item[1])[:10]:
+            print(f"    {count:>7}  {label}")
+
+
+def report_json(report: Report) -> Dict[str, Any]:
+    jobs = []
+    for job in report.jobs:
+        entry = asdict(job)
+        entry["scrapes_per_minute"] = job.scrapes_per_minute
+        entry["samples_per_second"] = job.samples_per_second
+        jobs.append(entry)
+    return {
+        "jobs": jobs,
+        "rules": [asdict(rule) for rule in report.rules],
+        "total_series": report.total_series,
+        "samples_per_second": report.samples_per_second,
+        "top_metrics": report.top_metrics,
+        "label_cardinality": report.label_cardinality,
+    }
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Estimate Prometheus cost of the rendered monitoring configs")
+    parser.add_argument("--prometheus", type=Path, default=GENERATED_DIR / "prometheus.yml")
+    parser.add_argument("--alloy", type=Path, default=GENERATED_DIR / "config.alloy")
+    parser.add_argument("--rules", type=Path, action="append", help="Rule file (repeatable)")
+    parser.add_argument("--series", type=Path, help="Saved /api/v1/series response to replay")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    parser.add_argument("--max-series", type=int, help="Fail if the fixture holds more series than this")
+    parser.add_argument("--max-samples", type=float, help="Fail if estimated samples/s exceed this")
+    parser.add_argument("--strict", action="store_true", help="Fail on any job or recording rule warning")
+    args = parser.parse_args(argv)
+    # both budgets are measured on the fixture; without one they could never fail
+    if args.series is None and (args.max_series is not None or args.max_samples is not None):
+        parser.error("--max-series/--max-samples need a --series fixture")
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    rules = args.rules or [GENERATED_DIR / "prometheus-alerts.yml"]
+    report = build_report(args.prometheus, args.alloy, rules, args.series)
+
+    if args.json:
+        print(json.dumps(report_json(report), indent=2))
+    else:
+        print_report(report)
+
+    failed = False
+    if args.max_series is not None and report.total_series is not None and report.total_series > args.max_series:
+        log_warn(f"{report.total_series} series exceeds budget of {args.max_series}")
+        failed = True
+    samples = report.samples_per_second
+    if args.max_samples is not None and samples is not None and samples > args.max_samples:
+        log_warn(f"{samples:.1f} samples/s exceeds budget of {args.max_samples}")
+        failed = True
+    if args.strict:
+        warned = [job.name for job in report.jobs if job.warnings]
+        warned += [rule.name for rule in report.rules if rule.kind == "record" and rule.warnings]
+        if warned:
+            log_warn(f"cost warnings for: {', '.join(warned)}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))